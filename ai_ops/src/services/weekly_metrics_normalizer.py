@@ -12,6 +12,7 @@ from __future__ import annotations
 
 import re
 from datetime import date, datetime, timedelta
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple
 
 import pandas as pd
@@ -38,6 +39,12 @@ KPI_COLUMN_MAP: Dict[str, str] = {
 # Columns that are NOT KPIs (skip during melt)
 _NON_KPI_COLS = {"week", "entity", "alerts", "notes", "week_key", "week_start", "week_end"}
 
+# Long-format output columns, in order
+_LONG_COLUMNS = [
+    "week_key", "week_start", "week_end", "entity", "kpi",
+    "value", "coverage_days", "notes",
+]
+
 # Regex for ISO-like week key: 2026-W08
 _WEEK_KEY_RE = re.compile(r"^\d{4}-W\d{2}$")
 
@@ -78,10 +85,27 @@ def week_start_from_key(week_key: str) -> date:
 # Parsing the "Week" column from the wide tab
 # ---------------------------------------------------------------------------
 
+# Week cell types worth memoising: hashable, and repeated on every entity row
+_CACHEABLE_WEEK_TYPES = (str, date, int, float)
+
+
 def _parse_week_field(raw: Any) -> Tuple[str, date, date]:
     """Parse a value from the 'Week' column of the wide-format tab.
 
-    Returns (week_key, week_start, week_end).
+    Returns (week_key, week_start, week_end).  Strings, dates and numbers
+    go through a memo keyed on (type, value) — every entity row repeats
+    the same weeks, and typed keys keep 1 / 1.0 apart since their str()
+    forms parse differently.  Anything else (e.g. a list or dict cell from
+    a JSON-derived frame) is parsed uncached, so an unhashable value still
+    fails with ValueError like any other unparseable week.
+    """
+    if isinstance(raw, _CACHEABLE_WEEK_TYPES):
+        return _parse_week_field_cached(raw)
+    return _parse_week_field_uncached(raw)
+
+
+def _parse_week_field_uncached(raw: Any) -> Tuple[str, date, date]:
+    """Parse one Week cell; raises ValueError if it is empty or unparseable.
 
     Accepts:
       • A string like '2026-W08'
@@ -116,6 +140,10 @@ def _parse_week_field(raw: Any) -> Tuple[str, date, date]:
     return wk, ws, we
 
 
+# Failures raise and are not cached
+_parse_week_field_cached = lru_cache(maxsize=4096, typed=True)(_parse_week_field_uncached)
+
+
 # ---------------------------------------------------------------------------
 # Wide → Long conversion
 # ---------------------------------------------------------------------------
@@ -139,11 +167,10 @@ def wide_to_long(wide_df: pd.DataFrame, default_coverage: int = 7) -> pd.DataFra
         log.warning("wide_to_long: input DataFrame is empty — returning empty long-format frame")
         return _empty_long_df()
 
-    df = wide_df.copy()
-
-    # Normalize column names to lowercase for matching
-    col_map = {c: c.strip().lower().replace(" ", "_") for c in df.columns}
-    df.rename(columns=col_map, inplace=True)
+    # Normalize column names to lowercase for matching (rename returns a
+    # new frame, so the caller's frame is untouched without a separate copy)
+    col_map = {c: c.strip().lower().replace(" ", "_") for c in wide_df.columns}
+    df = wide_df.rename(columns=col_map)
 
     # Validate required columns
     if "week" not in df.columns:
@@ -164,18 +191,25 @@ def wide_to_long(wide_df: pd.DataFrame, default_coverage: int = 7) -> pd.DataFra
 
     log.info("wide_to_long: KPI columns detected: %s", kpi_cols)
 
-    # Parse week field for every row
-    rows: List[Dict[str, Any]] = []
+    # Per-row fields, from plain column lists instead of iterrows()
+    notes_col = next((nc for nc in ("alerts", "notes") if nc in df.columns), None)
+    weeks = df["week"].tolist()
+    entities = df["entity"].tolist()
+    notes = df[notes_col].tolist() if notes_col else None
+
+    valid_pos: List[int] = []
+    valid_rows: List[Tuple[str, date, date, str, str]] = []
     skipped = 0
-    for idx, row in df.iterrows():
+    for pos, idx in enumerate(df.index):
+        raw_week = weeks[pos]
         try:
-            wk, ws, we = _parse_week_field(row.get("week"))
+            wk, ws, we = _parse_week_field(raw_week)
         except ValueError as e:
             log.warning("wide_to_long: skipping row %d — %s", idx, e)
             skipped += 1
             continue
 
-        entity = str(row.get("entity", "")).strip()
+        entity = str(entities[pos]).strip()
         if not entity:
             log.warning("wide_to_long: skipping row %d — empty entity", idx)
             skipped += 1
@@ -183,44 +217,38 @@ def wide_to_long(wide_df: pd.DataFrame, default_coverage: int = 7) -> pd.DataFra
 
         # Grab alert/notes column if present
         notes_val = ""
-        for nc in ("alerts", "notes"):
-            if nc in df.columns:
-                v = row.get(nc)
-                if v is not None and not (isinstance(v, float) and pd.isna(v)):
-                    notes_val = str(v).strip()
-                break
-
-        # Melt each KPI column
-        for col, canonical in kpi_cols.items():
-            raw_val = row.get(col)
-            # Skip blank / NaN — never write zeros for missing data
-            if raw_val is None:
-                continue
-            if isinstance(raw_val, float) and pd.isna(raw_val):
-                continue
-            if isinstance(raw_val, str) and raw_val.strip() == "":
-                continue
-
-            # Coerce to float
-            try:
-                value = float(pd.to_numeric(raw_val, errors="raise"))
-            except (ValueError, TypeError):
-                log.warning(
-                    "wide_to_long: non-numeric value '%s' for %s/%s/%s — skipping",
-                    raw_val, entity, canonical, wk,
-                )
-                continue
-
-            rows.append({
-                "week_key": wk,
-                "week_start": ws,
-                "week_end": we,
-                "entity": entity,
-                "kpi": canonical,
-                "value": value,
-                "coverage_days": default_coverage,
-                "notes": notes_val,
-            })
+        if notes is not None:
+            v = notes[pos]
+            if v is not None and not (isinstance(v, float) and pd.isna(v)):
+                notes_val = str(v).strip()
+
+        valid_pos.append(pos)
+        valid_rows.append((wk, ws, we, entity, notes_val))
+
+    # Coerce each KPI column for the valid rows; None marks a skipped cell
+    cells: Dict[str, List[Optional[float]]] = {}
+    for col, canonical in kpi_cols.items():
+        series = df[col]
+        if series.dtype.kind in "iuf" and not pd.api.types.is_extension_array_dtype(series):
+            # Plain numpy numeric column: NaN is the only blank, no parsing needed
+            arr = series.to_numpy(dtype=float)
+            cells[col] = [None if arr[p] != arr[p] else float(arr[p]) for p in valid_pos]
+            continue
+        raw_vals = series.tolist()
+        col_cells: List[Optional[float]] = []
+        for pos, (wk, _, _, entity, _) in zip(valid_pos, valid_rows):
+            col_cells.append(_coerce_kpi_value(raw_vals[pos], entity, canonical, wk))
+        cells[col] = col_cells
+
+    # Melt row by row, KPI columns in sheet order, so the keep-last dedup
+    # below resolves aliased columns (pipeline / pipeline_value) as before
+    rows: List[Tuple[Any, ...]] = []
+    kpi_items = list(kpi_cols.items())
+    for i, (wk, ws, we, entity, notes_val) in enumerate(valid_rows):
+        for col, canonical in kpi_items:
+            value = cells[col][i]
+            if value is not None:
+                rows.append((wk, ws, we, entity, canonical, value, default_coverage, notes_val))
 
     if skipped:
         log.info("wide_to_long: skipped %d row(s) due to parse errors", skipped)
@@ -229,7 +257,7 @@ def wide_to_long(wide_df: pd.DataFrame, default_coverage: int = 7) -> pd.DataFra
         log.warning("wide_to_long: produced 0 long-format rows")
         return _empty_long_df()
 
-    long_df = pd.DataFrame(rows)
+    long_df = pd.DataFrame.from_records(rows, columns=_LONG_COLUMNS)
 
     # Enforce uniqueness on (week_key, entity, kpi) — keep last if duplicates
     before = len(long_df)
@@ -240,10 +268,12 @@ def wide_to_long(wide_df: pd.DataFrame, default_coverage: int = 7) -> pd.DataFra
             "wide_to_long: dropped %d duplicate (week_key, entity, kpi) rows", before - after
         )
 
-    # Validate week_start is Monday and week_end is Sunday
-    bad_start = long_df[long_df["week_start"].apply(lambda d: d.weekday() != 0)]
-    if not bad_start.empty:
-        log.error("wide_to_long: %d rows have week_start != Monday — fixing", len(bad_start))
+    # Validate week_start is Monday and week_end is Sunday; checked once per
+    # wide row rather than per melted row
+    bad_starts = {ws for _, ws, _, _, _ in valid_rows if ws.weekday() != 0}
+    if bad_starts:
+        bad_count = int(long_df["week_start"].isin(bad_starts).sum())
+        log.error("wide_to_long: %d rows have week_start != Monday — fixing", bad_count)
         long_df["week_start"] = long_df["week_start"].apply(week_start_from_date)
         long_df["week_end"] = long_df["week_start"].apply(lambda d: d + timedelta(days=6))
 
@@ -260,8 +290,24 @@ def wide_to_long(wide_df: pd.DataFrame, default_coverage: int = 7) -> pd.DataFra
 # Helpers
 # ---------------------------------------------------------------------------
 
+def _coerce_kpi_value(raw_val: Any, entity: str, kpi: str, week_key: str) -> Optional[float]:
+    """Return *raw_val* as a float, or None if it is blank or non-numeric."""
+    # Skip blank / NaN / NA — never write zeros for missing data
+    if raw_val is None or raw_val is pd.NA:
+        return None
+    if isinstance(raw_val, float) and pd.isna(raw_val):
+        return None
+    if isinstance(raw_val, str) and raw_val.strip() == "":
+        return None
+    try:
+        return float(pd.to_numeric(raw_val, errors="raise"))
+    except (ValueError, TypeError):
+        log.warning(
+            "wide_to_long: non-numeric value '%s' for %s/%s/%s — skipping",
+            raw_val, entity, kpi, week_key,
+        )
+        return None
+
+
 def _empty_long_df() -> pd.DataFrame:
-    return pd.DataFrame(columns=[
-        "week_key", "week_start", "week_end", "entity", "kpi",
-        "value", "coverage_days", "notes",
-    ])
+    return pd.DataFrame(columns=_LONG_COLUMNS)
@@ -10,7 +10,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field, asdict
 from datetime import date
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 
 import pandas as pd
 
@@ -91,10 +91,18 @@ class WeeklyTrendResult:
     signals: List[TrendSignal] = field(default_factory=list)
     risks: List[str] = field(default_factory=list)
     reasoning_trace: List[str] = field(default_factory=list)
+    # Lookup sets built once in detect(): trace line prefixes
+    # ("WEEKLY_TREND", "WEEKLY_RISK") and risk tags ("Revenue pressure", ...)
+    trace_prefixes: Set[str] = field(default_factory=set)
+    risk_tags: Set[str] = field(default_factory=set)
+    # kpi -> its signals (one per entity), in the same order as ``signals``
+    signals_by_kpi: Dict[str, List[TrendSignal]] = field(default_factory=dict)
 
     def to_dict(self) -> Dict[str, Any]:
         d = asdict(self)
         d["signals"] = [s.to_dict() for s in self.signals]
+        # Derived from signals / reasoning_trace / risks; keep the serialised shape unchanged
+        del d["trace_prefixes"], d["risk_tags"], d["signals_by_kpi"]
         return d
 
 
@@ -120,6 +128,9 @@ class WeeklyTrendDetector:
         self.thresholds = thresholds or THRESHOLDS
         self.min_coverage = min_coverage
         self.momentum_sensitivity = momentum_sensitivity
+        # Momentum band multipliers, computed once instead of per classification
+        self._momentum_hi = 1 + momentum_sensitivity
+        self._momentum_lo = 1 - momentum_sensitivity
 
     # ------------------------------------------------------------------
     # Public API
@@ -157,26 +168,25 @@ class WeeklyTrendDetector:
 
         log.info("WeeklyTrendDetector: W1=%s  W0=%s  W-1=%s", w1_key, w0_key, w_minus1_key or "N/A")
 
-        w1_data = long_df[long_df["week_key"] == w1_key]
-        w0_data = long_df[long_df["week_key"] == w0_key]
-        w_minus1_data = long_df[long_df["week_key"] == w_minus1_key] if w_minus1_key else pd.DataFrame()
+        # One pass over the frame indexes the three weeks by (entity, kpi),
+        # instead of a boolean-mask scan of a week slice per pair
+        w1_index, w0_index, w_minus1_index = self._index_weeks(
+            long_df, w1_key, w0_key, w_minus1_key,
+        )
 
         signals: List[TrendSignal] = []
         reasoning: List[str] = []
         risks: List[str] = []
 
         # Determine all (entity, kpi) pairs across W1/W0
-        pairs = set()
-        for _, row in w1_data.iterrows():
-            pairs.add((str(row["entity"]), str(row["kpi"])))
-        for _, row in w0_data.iterrows():
-            pairs.add((str(row["entity"]), str(row["kpi"])))
+        pairs = {(str(entity), str(kpi)) for entity, kpi in w1_index}
+        pairs.update((str(entity), str(kpi)) for entity, kpi in w0_index)
 
         for entity, kpi in sorted(pairs):
             signal = self._compute_signal(
                 entity, kpi,
                 w1_key, w0_key, w_minus1_key,
-                w1_data, w0_data, w_minus1_data,
+                w1_index, w0_index, w_minus1_index,
                 reasoning,
             )
             signals.append(signal)
@@ -187,6 +197,10 @@ class WeeklyTrendDetector:
         # Generate risk flags
         risks = self._generate_risks(signals, reasoning)
 
+        signals_by_kpi: Dict[str, List[TrendSignal]] = {}
+        for sig in signals:
+            signals_by_kpi.setdefault(sig.kpi, []).append(sig)
+
         result = WeeklyTrendResult(
             w1_key=w1_key,
             w0_key=w0_key,
@@ -194,6 +208,9 @@ class WeeklyTrendDetector:
             signals=signals,
             risks=risks,
             reasoning_trace=reasoning,
+            trace_prefixes={r.split(":", 1)[0] for r in reasoning},
+            risk_tags={r.split(":", 1)[0] for r in risks},
+            signals_by_kpi=signals_by_kpi,
         )
         log.info(
             "WeeklyTrendDetector: produced %d signals, %d risk flags",
@@ -212,14 +229,14 @@ class WeeklyTrendDetector:
         w1_key: str,
         w0_key: str,
         w_minus1_key: Optional[str],
-        w1_data: pd.DataFrame,
-        w0_data: pd.DataFrame,
-        w_minus1_data: pd.DataFrame,
+        w1_index: Dict[tuple, tuple],
+        w0_index: Dict[tuple, tuple],
+        w_minus1_index: Dict[tuple, tuple],
         reasoning: List[str],
     ) -> TrendSignal:
         # Look up values
-        v1, cov1 = self._lookup(w1_data, entity, kpi)
-        v0, cov0 = self._lookup(w0_data, entity, kpi)
+        v1, cov1 = self._lookup(w1_index, entity, kpi)
+        v0, cov0 = self._lookup(w0_index, entity, kpi)
 
         # Coverage gating
         if v1 is None or v0 is None:
@@ -284,8 +301,8 @@ class WeeklyTrendDetector:
 
         # Momentum (requires W-1)
         momentum = "NA"
-        if w_minus1_key and not w_minus1_data.empty:
-            v_m1, _ = self._lookup(w_minus1_data, entity, kpi)
+        if w_minus1_key and w_minus1_index:
+            v_m1, _ = self._lookup(w_minus1_index, entity, kpi)
             if v_m1 is not None:
                 delta0 = v0 - v_m1
                 delta1 = delta  # v1 - v0
@@ -321,45 +338,72 @@ class WeeklyTrendDetector:
     # Helpers
     # ------------------------------------------------------------------
 
+    @staticmethod
+    def _index_weeks(
+        long_df: pd.DataFrame, *week_keys: Optional[str]
+    ) -> List[Dict[tuple, tuple]]:
+        """Map (entity, kpi) -> (raw value, raw coverage_days) for each week key.
+
+        Returns one dict per key, in order (empty for a None key).  Later
+        rows overwrite earlier ones, so duplicates resolve to the last row.
+        """
+        n = len(long_df)
+        cols = long_df.columns
+        values = long_df["value"].tolist() if "value" in cols else [None] * n
+        coverage = long_df["coverage_days"].tolist() if "coverage_days" in cols else [7] * n
+
+        indexes: Dict[Any, Dict[tuple, tuple]] = {wk: {} for wk in week_keys if wk}
+        for wk, entity, kpi, raw_val, raw_cov in zip(
+            long_df["week_key"].tolist(), long_df["entity"].tolist(),
+            long_df["kpi"].tolist(), values, coverage,
+        ):
+            index = indexes.get(wk)
+            if index is not None:
+                index[(entity, kpi)] = (raw_val, raw_cov)
+        return [indexes[wk] if wk else {} for wk in week_keys]
+
     @staticmethod
     def _lookup(
-        data: pd.DataFrame, entity: str, kpi: str
+        index: Dict[tuple, tuple], entity: str, kpi: str
     ) -> tuple[Optional[float], int]:
-        """Look up value + coverage_days for a given (entity, kpi) in a week slice."""
-        if data is None or data.empty:
-            return None, 0
-        mask = (data["entity"] == entity) & (data["kpi"] == kpi)
-        rows = data[mask]
-        if rows.empty:
+        """Look up value + coverage_days for a given (entity, kpi) in a week index."""
+        entry = index.get((entity, kpi))
+        if entry is None:
             return None, 0
-        row = rows.iloc[-1]
-        raw_val = row.get("value")
+        raw_val, raw_cov = entry
         if raw_val is None:
-            return None, int(row.get("coverage_days", 7))
+            return None, int(raw_cov)
         try:
             val = float(raw_val)
         except (ValueError, TypeError):
-            return None, int(row.get("coverage_days", 7))
-        cov = int(row.get("coverage_days", 7))
+            return None, int(raw_cov)
+        cov = int(raw_cov)
         return val, cov
 
     def _classify_momentum(self, delta0: float, delta1: float) -> str:
         """Classify momentum based on two successive deltas."""
-        M = self.momentum_sensitivity
-
-        # Both positive or both negative (same direction)
-        if (delta0 > 0 and delta1 > 0) or (delta0 < 0 and delta1 < 0):
-            if abs(delta1) > abs(delta0) * (1 + M):
-                return "ACCELERATING"
-            if abs(delta1) < abs(delta0) * (1 - M):
-                return "DECELERATING"
-            return "STABLE"
-
-        # Direction changed
-        if (delta0 > 0 and delta1 < 0) or (delta0 < 0 and delta1 > 0):
-            return "DECELERATING"
+        # Branch on delta0's sign once; each path then needs one or two
+        # comparisons on delta1 instead of re-testing both signs
+        if delta0 > 0:
+            if delta1 < 0:
+                return "DECELERATING"      # direction changed
+            if not delta1 > 0:
+                return "STABLE"            # W1 flat
+            a0, a1 = delta0, delta1
+        elif delta0 < 0:
+            if delta1 > 0:
+                return "DECELERATING"      # direction changed
+            if not delta1 < 0:
+                return "STABLE"            # W1 flat
+            a0, a1 = -delta0, -delta1
+        else:
+            return "STABLE"                # W0 flat (or NaN)
 
-        # One of them is zero / flat
+        # Same direction: compare magnitudes
+        if a1 > a0 * self._momentum_hi:
+            return "ACCELERATING"
+        if a1 < a0 * self._momentum_lo:
+            return "DECELERATING"
         return "STABLE"
 
     def _generate_risks(
@@ -68,6 +68,9 @@ _INVALID_CHARS = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
 _MAX_FILENAME_LEN = 120
 _TRAILING_DOT_SPACE = re.compile(r'[\s.]+$')
 
+# "suitability <type>:<file> tier=N" evidence lines
+_TIER_RE = re.compile(r"suitability .+? tier=(\d+)")
+
 
 def _sanitize_filename(name: str, index: int = 0) -> str:
     """Remove Windows-invalid chars, trailing dots/spaces, and cap total length.
@@ -275,7 +278,7 @@ def extract_kpis_from_attachments(
     # LLM enhancement layer (post-regex)
     best_tier = 4
     for ev in evidence:
-        m = re.search(r"suitability .+? tier=(\d+)", ev)
+        m = _TIER_RE.search(ev)
         if m:
             best_tier = min(best_tier, int(m.group(1)))
 
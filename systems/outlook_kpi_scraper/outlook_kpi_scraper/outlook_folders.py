@@ -0,0 +1,140 @@
+"""
+Outlook mail-folder enumeration shared by the batch and integration scripts.
+
+Walking every folder of a mailbox over COM costs one cross-process call
+per Folders.Count / folder access, so the resulting path list is cached
+per mailbox in data/folder_cache/<mailbox>.json and reused while it is
+younger than max_age_hours.  On a cold cache the top-level folders are
+walked concurrently, each thread in its own COM apartment.
+"""
+
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger(__name__)
+
+# Folders that are not mail containers — skip them entirely
+SKIP_FOLDERS = frozenset({
+    "calendar", "contacts", "tasks", "notes", "journal",
+    "rss feeds", "rss subscriptions", "sync issues",
+    "social activity notifications", "quick step settings",
+    "yammer root", "conversation history", "conversation action settings",
+    "externalcontacts", "files", "chip",
+})
+
+CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'folder_cache')
+DEFAULT_MAX_AGE_HOURS = 24
+MAX_WALK_WORKERS = 4         # concurrent top-level folder walks
+
+
+def _cache_path(mailbox_name: str) -> str:
+    safe = re.sub(r"[^\w.-]+", "_", mailbox_name).strip("_") or "mailbox"
+    return os.path.join(CACHE_DIR, f"{safe}.json")
+
+
+def _read_cache(path: str, max_age_hours: float) -> list[str] | None:
+    try:
+        if time.time() - os.path.getmtime(path) > max_age_hours * 3600:
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            paths = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return paths if isinstance(paths, list) else None
+
+
+def _write_cache(path: str, paths: list[str]) -> None:
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Per-process temp name: concurrent writers never share a half-written file
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(paths, f)
+        os.replace(tmp, path)
+    except OSError as exc:
+        log.debug("Could not write folder cache %s: %s", path, exc)
+
+
+def enumerate_outlook_folders(mailbox_name: str,
+                              max_age_hours: float = DEFAULT_MAX_AGE_HOURS,
+                              refresh: bool = False) -> list[str]:
+    """Return every mail folder path ('Inbox/Sub') in *mailbox_name*.
+
+    Served from the on-disk cache when it is fresh unless *refresh* is set;
+    an empty result (mailbox not found) is never cached.
+    """
+    cache_path = _cache_path(mailbox_name)
+    if not refresh:
+        cached = _read_cache(cache_path, max_age_hours)
+        if cached is not None:
+            log.info("Folder list for '%s' served from cache (%d folders)",
+                     mailbox_name, len(cached))
+            return cached
+
+    import win32com.client
+
+    store = _find_store(win32com.client, mailbox_name)
+    if not store:
+        return []
+
+    # Only top-level names are checked; everything below inherits
+    top_names = [n for n in (f.Name for f in store.Folders)
+                 if n.lower() not in SKIP_FOLDERS]
+
+    if len(top_names) > 1:
+        # COM objects are bound to the apartment that created them, so each
+        # worker opens its own Outlook session and walks one top-level tree
+        with ThreadPoolExecutor(max_workers=min(len(top_names), MAX_WALK_WORKERS)) as pool:
+            trees = list(pool.map(lambda n: _walk_top_level(mailbox_name, n), top_names))
+    else:
+        trees = []
+        for name in top_names:
+            paths = []
+            _walk(store.Folders.Item(name), name, paths)
+            trees.append(paths)
+    all_paths = [p for tree in trees for p in tree]
+
+    if all_paths:
+        _write_cache(cache_path, all_paths)
+    return all_paths
+
+
+def _find_store(client, mailbox_name: str):
+    outlook = client.Dispatch("Outlook.Application").GetNamespace("MAPI")
+    for s in outlook.Folders:
+        if s.Name == mailbox_name:
+            return s
+    log.warning("Mailbox '%s' not found. Available: %s",
+                mailbox_name, [s.Name for s in outlook.Folders])
+    return None
+
+
+def _walk(folder, full_path: str, paths: list[str]) -> None:
+    paths.append(full_path)
+    try:
+        # Enumerating the collection lets pywin32 fetch children in
+        # batches instead of one Item(i) round-trip each
+        for sub in folder.Folders:
+            _walk(sub, f"{full_path}/{sub.Name}", paths)
+    except Exception:
+        pass
+
+
+def _walk_top_level(mailbox_name: str, top_name: str) -> list[str]:
+    """Walk one top-level folder tree from a worker thread's own COM apartment."""
+    import pythoncom
+    import win32com.client
+
+    pythoncom.CoInitialize()
+    try:
+        store = _find_store(win32com.client, mailbox_name)
+        paths = []
+        if store:
+            _walk(store.Folders.Item(top_name), top_name, paths)
+        return paths
+    finally:
+        pythoncom.CoUninitialize()
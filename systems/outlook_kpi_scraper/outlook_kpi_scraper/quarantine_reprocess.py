@@ -35,7 +35,7 @@ import os
 import re
 import time
 from datetime import datetime
-from typing import Any
+from typing import Any, Iterator
 
 import yaml
 
@@ -151,18 +151,21 @@ def _llm_available() -> bool:
 # Quarantine CSV reader
 # ------------------------------------------------------------------
 
-def load_quarantine_csv(csv_path: str) -> list[dict]:
-    """Read a quarantined.csv and return list of row dicts."""
-    rows = []
+def iter_quarantine_csv(csv_path: str) -> Iterator[dict]:
+    """Yield the row dicts of a quarantined.csv one at a time."""
     with open(csv_path, "r", encoding="utf-8", errors="replace") as f:
         reader = csv.DictReader(f)
         for row in reader:
             # Normalise boolean
             ha = row.get("has_attachments", "")
             if isinstance(ha, str):
-                row["has_attachments"] = ha.lower() in ("true", "1", "yes")
-            rows.append(row)
-    return rows
+                row["has_attachments"] = ha.strip().lower() in ("true", "1", "yes")
+            yield row
+
+
+def load_quarantine_csv(csv_path: str) -> list[dict]:
+    """Read a quarantined.csv and return list of row dicts."""
+    return list(iter_quarantine_csv(csv_path))
 
 
 def _parse_attachment_names(raw: str) -> list[str]:
@@ -181,9 +184,12 @@ def _get_exts(att_names: list[str]) -> list[str]:
 # Deterministic pre-filter
 # ------------------------------------------------------------------
 
-def deterministic_prefilter(row: dict) -> dict[str, Any]:
+def deterministic_prefilter(row: dict, gate: dict | None = None) -> dict[str, Any]:
     """Apply the attachment type gate to a quarantine row.
 
+    *gate* may be a result of evaluate_attachment_gate() already computed
+    for this row; otherwise it is evaluated here.
+
     Returns a dict with:
         eligible : bool – True if row should proceed to LLM classification
         decision : str  – gate decision
@@ -193,13 +199,14 @@ def deterministic_prefilter(row: dict) -> dict[str, Any]:
     att_names = _parse_attachment_names(row.get("attachment_names", ""))
     exts = _get_exts(att_names)
 
-    # Build a pseudo-msg for the attachment gate
-    pseudo_msg = {
-        "has_attachments": row.get("has_attachments", False),
-        "attachment_names": row.get("attachment_names", ""),
-        "subject": row.get("subject", ""),
-    }
-    gate = evaluate_attachment_gate(pseudo_msg)
+    if gate is None:
+        # Build a pseudo-msg for the attachment gate
+        pseudo_msg = {
+            "has_attachments": row.get("has_attachments", False),
+            "attachment_names": row.get("attachment_names", ""),
+            "subject": row.get("subject", ""),
+        }
+        gate = evaluate_attachment_gate(pseudo_msg)
 
     decision = gate["decision"]
     kpi_exts = gate["kpi_attachment_exts"]
@@ -631,7 +638,7 @@ _ADMITTED_FIELDS = [
 
 def _write_admitted_csv(path: str, rows: list[dict]):
     """Write admitted candidates CSV."""
-    with open(path, "w", newline="", encoding="utf-8") as f:
+    with open(path, "w", newline="", encoding="utf-8", buffering=1 << 18) as f:
         writer = csv.DictWriter(f, fieldnames=_ADMITTED_FIELDS, extrasaction="ignore")
         writer.writeheader()
         writer.writerows(rows)
@@ -653,7 +660,7 @@ def _write_keep_csv(path: str, rows_with_reasons: list[tuple[dict, str]]):
         out["keep_reason"] = reason
         out_rows.append(out)
 
-    with open(path, "w", newline="", encoding="utf-8") as f:
+    with open(path, "w", newline="", encoding="utf-8", buffering=1 << 18) as f:
         writer = csv.DictWriter(f, fieldnames=_KEEP_FIELDS, extrasaction="ignore")
         writer.writeheader()
         writer.writerows(out_rows)
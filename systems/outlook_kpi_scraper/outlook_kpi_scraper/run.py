@@ -39,7 +39,7 @@ from outlook_kpi_scraper.dep_check import check_ocr_dependencies
 from outlook_kpi_scraper.ledger import Ledger
 from outlook_kpi_scraper.run_logger import RunLogger
 from outlook_kpi_scraper.source_matcher import (
-    load_source_mapping, match_email, validate_extracted_kpis,
+    TOP_SCORES_KEPT, load_source_mapping, match_email, validate_extracted_kpis,
 )
 from outlook_kpi_scraper.writers.google_sheets_writer import GoogleSheetsWriter
 from outlook_kpi_scraper.writers.csv_writer import CSVWriter
@@ -393,7 +393,7 @@ def main():
     parser.add_argument("--no-require-kpi", dest="require_kpi", action="store_false",
                         help="Append all extracted rows even if no KPI values")
     parser.add_argument("--batch-size", type=int, default=200,
-                        help="Google Sheets batch size (rows per API call)")
+                        help="Google Sheets batch size (rows per API call when a flush has to be split)")
     parser.add_argument("--debug-attachment", type=str, default=None, metavar="PATH",
                         help="Debug a single attachment file: print suitability, OCR status, and extracted KPIs then exit.")
     args = parser.parse_args()
@@ -579,7 +579,7 @@ def main():
                 run_logger.add_quarantined(
                     msg,
                     reason="no source rule matched",
-                    top_scores=src_match.all_scores[:3],
+                    top_scores=src_match.all_scores[:TOP_SCORES_KEPT],
                 )
                 log.info("QUARANTINE: sender=%s subject=%s (no source rule)",
                          msg.get("sender_email"), msg.get("subject"))
@@ -789,14 +789,19 @@ def main():
     if env.get("GOOGLE_SHEET_ID") and env.get("GOOGLE_SERVICE_ACCOUNT_JSON_PATH"):
         writer = GoogleSheetsWriter(env, batch_size=args.batch_size)
     else:
-        writer = CSVWriter()
+        writer = CSVWriter(
+            compress=env.get("CSV_GZIP", "").lower() in ("1", "true", "yes", "on"))
 
+    # Rows reaching here already passed the require_kpi gate (step 3) when
+    # it is on; --no-require-kpi appends every extracted row
+    written = 0
     for entry_id, row in extracted_rows:
         if ledger.is_processed(entry_id):
             continue
         writer.append_row(row)
+        written += 1
 
-    # Flush batch (Google Sheets) or no-op (CSV already wrote per-row)
+    # Flush batch (Google Sheets) or close the CSV handle (rows already written)
     appended = 0
     failed_appends_count = 0
     if hasattr(writer, "flush"):
@@ -805,7 +810,8 @@ def main():
         for r in writer.results:
             run_logger.add_append_result(**r)
     else:
-        appended = len(extracted_rows)
+        writer.close()
+        appended = written
 
     # Mark processed in ledger
     for entry_id, row in extracted_rows:
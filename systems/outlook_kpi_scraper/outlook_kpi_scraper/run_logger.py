@@ -7,12 +7,17 @@ Artifacts produced:
   - append_results.csv
   - raw_debug.log  (via Python logging)
   - CHIP_REVIEW.txt  (single human-readable file for Chip)
+  - CHIP_REVIEW.md   (legacy, only with write_legacy_md=True)
   - attachments/    (populated by attachment_extractor)
 """
 
 import csv
+import functools
+import io
 import json
 import logging
+import logging.handlers
+import operator
 import os
 import sys
 from collections import Counter
@@ -20,21 +25,112 @@ from datetime import datetime
 
 
 # Skip categories for deterministic reporting
-SKIP_REASONS = {
+SKIP_REASONS = frozenset({
     "NO_KPI_VALUES", "DENY_DOMAIN", "MEETING_INVITE", "NEWSLETTER",
     "LOW_SCORE", "PARSE_FAILED", "ATTACHMENT_SAVE_FAILED", "DEP_MISSING(PDF)",
-}
+})
+
+_RUN_ID_FMT = "%Y%m%d_%H%M%S"
+
+# Streamed CSVs get a large write buffer so rows reach disk in big chunks
+_CSV_BUFFER_SIZE = 1 << 20
+
+# CHIP_REVIEW rules, newline-terminated
+_BANNER = "=" * 70 + "\n"
+_SUBBANNER = "-" * 50 + "\n"
+_REVIEW_FOOTER = f"{_BANNER}  END OF CHIP REVIEW\n{_BANNER}".rstrip("\n")
+
+# Fixed-layout CHIP_REVIEW sections, filled with a single str.format call
+_REVIEW_HEADER_TMPL = (
+    _BANNER
+    + "  CHIP REVIEW — Run {title_run_id}\n"
+    + _BANNER
+    + "\n"
+    "  run_id:       {run_id}\n"
+    "  mailbox:      {mailbox}\n"
+    "  folder:       {folder}\n"
+    "  days:         {days}\n"
+    "  max_scanned:  {max}\n"
+    "  start:        {timestamp}\n"
+    "  duration:     {duration_sec:.1f}s\n"
+    "\n"
+)
+_REVIEW_COUNTS_TMPL = (
+    _SUBBANNER
+    + "  COUNTS\n"
+    + _SUBBANNER
+    + "  scanned:             {scanned}\n"
+    "  candidates:          {candidate_count}\n"
+    "  extracted_with_kpis: {extracted_count}\n"
+    "  appended:            {appended_count}\n"
+    "  skipped_no_kpi:      {skipped_no_kpi}\n"
+    "  quarantined:         {quarantined_count}\n"
+    "  kpi_validation_rej:  {kpi_validation_rejects}\n"
+    "  failed:              {failed_count}\n"
+    "  append_ok:           {append_ok}\n"
+    "  append_failed:       {append_failed}\n"
+    "  source_rules:        {source_rules}\n"
+    "\n"
+)
+
+# Markdown-table escaping: pipes would split cells, newlines would end the row
+_MD_ESC_TABLE = str.maketrans({"|": "/", "\n": " ", "\r": ""})
+
+
+def _domain_of(email: str) -> str:
+    """Return the part after the last '@', or '' if there is none."""
+    _, sep, domain = (email or "").rpartition("@")
+    return domain if sep else ""
+
+
+@functools.lru_cache(maxsize=8)
+def _load_trusted_domains(path: str, mtime: float) -> frozenset[str]:
+    """Read a trusted-domains file; *mtime* is part of the cache key so edits are picked up."""
+    with open(path, "r", encoding="utf-8") as f:
+        return frozenset(
+            stripped for stripped in (line.strip().lower() for line in f)
+            if stripped and not stripped.startswith("#")
+        )
+
+
+def _fmt_review_amount(v) -> str:
+    if isinstance(v, float) and v == int(v):
+        return f"{int(v):,}"
+    if isinstance(v, (int, float)):
+        return f"{v:,.2f}"
+    return str(v)
+
+
+def _fmt_review_occupancy(v) -> str:
+    if isinstance(v, float) and v <= 1.0:
+        return f"{v:.1%}"
+    return str(v)
+
+
+# KPI fields shown in CHIP_REVIEW, in display order, with their formatter
+_REVIEW_KPI_FORMATTERS = (
+    ("revenue", _fmt_review_amount),
+    ("cash", _fmt_review_amount),
+    ("pipeline_value", _fmt_review_amount),
+    ("closings_count", _fmt_review_amount),
+    ("orders_count", _fmt_review_amount),
+    ("occupancy", _fmt_review_occupancy),
+)
 
 
 class RunLogger:
-    """Manages all per-run logging artifacts."""
+    """Manages all per-run logging artifacts.
 
-    CANDIDATE_FIELDS = [
+    The legacy CHIP_REVIEW.md is only written when ``write_legacy_md=True``;
+    CHIP_REVIEW.txt supersedes it.
+    """
+
+    CANDIDATE_FIELDS = (
         "sender_email", "sender_domain", "subject", "received_dt",
         "score", "reasons", "has_attachments", "attachment_names",
         "why_skipped",
-    ]
-    KPI_FIELDS = [
+    )
+    KPI_FIELDS = (
         "date", "entity", "revenue", "cash", "pipeline_value",
         "closings_count", "orders_count", "occupancy", "alerts", "notes",
         "run_id", "message_id", "sender", "subject", "candidate_score",
@@ -48,18 +144,33 @@ class RunLogger:
         "evidence_source", "sender_email", "sheet_name",
         "cell_reference", "extraction_proof", "confidence_score",
         "evidence", "decision_trace_id",
-    ]
-    APPEND_FIELDS = [
+    )
+    APPEND_FIELDS = (
         "batch_index", "row_index", "entity", "date", "status",
         "error", "retry_count",
-    ]
-
-    def __init__(self, base_dir: str | None = None):
-        self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+    )
+    QUARANTINE_FIELDS = (
+        "sender_email", "sender_domain", "subject", "received_dt",
+        "score", "reason", "top_scores", "has_attachments", "attachment_names",
+    )
+
+    # Dict -> CSV row projections.  The candidate / quarantine / append
+    # dicts always carry every field; KPI rows may not, so those use .get().
+    _candidate_csv_row = operator.itemgetter(*CANDIDATE_FIELDS)
+    _quarantine_csv_row = operator.itemgetter(*QUARANTINE_FIELDS)
+    _append_csv_row = operator.itemgetter(*APPEND_FIELDS)
+
+    # How many rows of each kind CHIP_REVIEW prints (all rows go to CSV)
+    EXTRACTED_PREVIEW = 30
+    SKIPPED_PREVIEW = 15
+    QUARANTINED_PREVIEW = 10
+
+    def __init__(self, base_dir: str | None = None, write_legacy_md: bool = False):
+        self.write_legacy_md = write_legacy_md
         if base_dir is None:
             base_dir = os.path.join(os.path.dirname(__file__), "..", "logs", "runs")
-        self.run_dir = os.path.join(base_dir, self.run_id)
-        self.attachments_dir = os.path.join(self.run_dir, "attachments")
+        self.run_id, self.run_dir = self._claim_run_dir(base_dir)
+        self.attachments_dir = self._run_path("attachments")
         os.makedirs(self.attachments_dir, exist_ok=True)
 
         # ---- raw_debug.log via Python logging ----
@@ -72,12 +183,25 @@ class RunLogger:
         except Exception:
             pass  # not all environments support reconfigure
 
-        # ---- accumulators ----
-        self._candidates: list[dict] = []
+        # ---- streaming CSV sinks (rows are written as they arrive) ----
+        self._csv_files: list = []
+        self._cand_writer = self._open_csv("candidates.csv", self.CANDIDATE_FIELDS)
+        self._kpi_writer = self._open_csv("extracted_rows.csv", self.KPI_FIELDS)
+        self._append_writer = self._open_csv("append_results.csv", self.APPEND_FIELDS)
+
+        self._quar_writer = None  # opened on first quarantine
+
+        # ---- accumulators (bounded previews + counters for CHIP_REVIEW) ----
         self._skipped_candidates: list[dict] = []
+        self._skipped_count = 0
+        self._meeting_skips = 0
         self._quarantined: list[dict] = []
+        self._quarantined_count = 0
         self._extracted: list[dict] = []
-        self._append_results: list[dict] = []
+        self._extracted_count = 0
+        self._source_type_counts: Counter = Counter()
+        self._append_ok = 0
+        self._append_fail = 0
         self._summary: dict = {}
         self._extraction_failures: list[dict] = []
         self._new_domains_seen: Counter = Counter()
@@ -86,17 +210,30 @@ class RunLogger:
     # Logging setup
     # ------------------------------------------------------------------
     def _setup_file_logging(self):
-        log_path = os.path.join(self.run_dir, "raw_debug.log")
         root = logging.getLogger()
+        log_path = self._run_path("raw_debug.log")
         root.setLevel(logging.DEBUG)
-        # Remove any existing handlers
+        # Remove any existing handlers (e.g. a previous run's in this
+        # process), closing them so their buffered records reach disk and
+        # their files are released.  MemoryHandler.close() leaves its
+        # target open, so close that too.
         for h in root.handlers[:]:
             root.removeHandler(h)
-        # File handler: everything (DEBUG+)
-        fh = logging.FileHandler(log_path, encoding="utf-8")
+            target = getattr(h, "target", None)
+            h.close()
+            if target is not None:
+                target.close()
+        # File handler: everything (DEBUG+), buffered so the file is written
+        # in batches rather than flushed per record.  ERROR+ (and flush() /
+        # interpreter shutdown) forces the buffer out.  delay=True: the file
+        # is only created once there is something to write.
+        fh = logging.FileHandler(log_path, encoding="utf-8", delay=True)
         fh.setLevel(logging.DEBUG)
         fh.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
-        root.addHandler(fh)
+        self._log_buffer = logging.handlers.MemoryHandler(
+            1024, flushLevel=logging.ERROR, target=fh, flushOnClose=True,
+        )
+        root.addHandler(self._log_buffer)
         # Console handler: INFO+ only (minimal noise)
         ch = logging.StreamHandler(sys.stderr)
         ch.setLevel(logging.INFO)
@@ -117,26 +254,27 @@ class RunLogger:
     # ------------------------------------------------------------------
     def add_candidate(self, msg: dict, score: int, reasons: list[str],
                       has_attachments: bool = False, attachment_names: str = ""):
-        self._candidates.append({
-            "sender_email": msg.get("sender_email", ""),
-            "sender_domain": (msg.get("sender_email") or "").split("@")[-1]
-                             if "@" in (msg.get("sender_email") or "") else "",
-            "subject": msg.get("subject", ""),
-            "received_dt": msg.get("received_dt", ""),
-            "score": score,
-            "reasons": ";".join(reasons) if isinstance(reasons, list) else str(reasons),
-            "has_attachments": has_attachments,
-            "attachment_names": attachment_names,
-            "why_skipped": "",
-        })
+        email = msg.get("sender_email", "") or ""
+        # Row in CANDIDATE_FIELDS order; nothing else reads it, so no dict
+        self._cand_writer.writerow((
+            email,
+            _domain_of(email),
+            msg.get("subject", ""),
+            msg.get("received_dt", ""),
+            score,
+            ";".join(reasons) if isinstance(reasons, list) else str(reasons),
+            has_attachments,
+            attachment_names,
+            "",
+        ))
 
     def add_skipped_candidate(self, msg: dict, score: int, reasons: list[str],
                               why_skipped: str = ""):
         """Track a candidate that was scored but did not produce KPIs."""
-        self._skipped_candidates.append({
-            "sender_email": msg.get("sender_email", ""),
-            "sender_domain": (msg.get("sender_email") or "").split("@")[-1]
-                             if "@" in (msg.get("sender_email") or "") else "",
+        email = msg.get("sender_email", "") or ""
+        row = {
+            "sender_email": email,
+            "sender_domain": _domain_of(email),
             "subject": msg.get("subject", ""),
             "received_dt": msg.get("received_dt", ""),
             "score": score,
@@ -144,7 +282,13 @@ class RunLogger:
             "has_attachments": msg.get("has_attachments", False),
             "attachment_names": msg.get("attachment_names", ""),
             "why_skipped": why_skipped,
-        })
+        }
+        self._cand_writer.writerow(self._candidate_csv_row(row))
+        self._skipped_count += 1
+        if "meeting_invite_penalty" in row["reasons"]:
+            self._meeting_skips += 1
+        if len(self._skipped_candidates) < self.SKIPPED_PREVIEW:
+            self._skipped_candidates.append(row)
 
     def track_domain(self, domain: str):
         """Track a domain seen in email traffic for tuning suggestions."""
@@ -160,18 +304,24 @@ class RunLogger:
     def add_quarantined(self, msg: dict, reason: str = "",
                         top_scores: list | None = None):
         """Track a quarantined email (no source rule matched)."""
-        self._quarantined.append({
-            "sender_email": msg.get("sender_email", ""),
-            "sender_domain": (msg.get("sender_email") or "").split("@")[-1]
-                             if "@" in (msg.get("sender_email") or "") else "",
+        email = msg.get("sender_email", "") or ""
+        row = {
+            "sender_email": email,
+            "sender_domain": _domain_of(email),
             "subject": msg.get("subject", ""),
             "received_dt": msg.get("received_dt", ""),
             "score": msg.get("candidate_score", 0),
             "reason": reason,
-            "top_scores": str(top_scores or []),
+            "top_scores": json.dumps(top_scores or [], separators=(",", ":"), default=str),
             "has_attachments": msg.get("has_attachments", False),
             "attachment_names": msg.get("attachment_names", ""),
-        })
+        }
+        if self._quar_writer is None:
+            self._quar_writer = self._open_csv("quarantined.csv", self.QUARANTINE_FIELDS)
+        self._quar_writer.writerow(self._quarantine_csv_row(row))
+        self._quarantined_count += 1
+        if len(self._quarantined) < self.QUARANTINED_PREVIEW:
+            self._quarantined.append(row)
 
     # ------------------------------------------------------------------
     # Extracted-row tracking
@@ -184,7 +334,9 @@ class RunLogger:
                           entry_id: str = "",
                           source_rule_id: str = "",
                           source_match_score: float = 0.0):
-        row = dict(kpi_row)
+        # Only KPI_FIELDS are ever read back, so drop any other (possibly
+        # large) keys the extractor attached; absent keys stay absent
+        row = {k: kpi_row[k] for k in self.KPI_FIELDS if k in kpi_row}
         row["sender_email"] = sender_email
         row["subject"] = subject
         row["evidence_source"] = evidence_source or row.get("evidence_source", "")
@@ -207,7 +359,11 @@ class RunLogger:
         # Decision trace: run_id + msg entry_id suffix
         eid_suffix = entry_id[-12:] if entry_id else "N/A"
         row["decision_trace_id"] = f"{self.run_id}_{eid_suffix}"
-        self._extracted.append(row)
+        self._kpi_writer.writerow([row.get(k) for k in self.KPI_FIELDS])
+        self._extracted_count += 1
+        self._source_type_counts[source_type] += 1
+        if len(self._extracted) < self.EXTRACTED_PREVIEW:
+            self._extracted.append(row)
 
     # ------------------------------------------------------------------
     # Append-result tracking
@@ -215,7 +371,7 @@ class RunLogger:
     def add_append_result(self, batch_index: int, row_index: int,
                           entity: str, date: str, status: str,
                           error: str = "", retry_count: int = 0):
-        self._append_results.append({
+        row = {
             "batch_index": batch_index,
             "row_index": row_index,
             "entity": entity,
@@ -223,7 +379,12 @@ class RunLogger:
             "status": status,
             "error": error,
             "retry_count": retry_count,
-        })
+        }
+        self._append_writer.writerow(self._append_csv_row(row))
+        if status == "OK":
+            self._append_ok += 1
+        else:
+            self._append_fail += 1
 
     # ------------------------------------------------------------------
     # Summary
@@ -255,91 +416,121 @@ class RunLogger:
     # Flush all artifacts to disk
     # ------------------------------------------------------------------
     def flush(self, attachment_decisions=None):
-        all_candidates = self._candidates + self._skipped_candidates
-        self._write_csv("candidates.csv", self.CANDIDATE_FIELDS, all_candidates)
-        self._write_csv("extracted_rows.csv", self.KPI_FIELDS, self._extracted)
-        self._write_csv("append_results.csv", self.APPEND_FIELDS, self._append_results)
-        if self._quarantined:
-            q_fields = ["sender_email", "sender_domain", "subject", "received_dt",
-                        "score", "reason", "top_scores", "has_attachments", "attachment_names"]
-            self._write_csv("quarantined.csv", q_fields, self._quarantined)
+        # All CSVs were streamed as rows arrived; just close them
+        for f in self._csv_files:
+            f.close()
+        self._csv_files.clear()
         self._write_json("run_summary.json", self._summary)
         self._write_chip_review(attachment_decisions or [])
         logging.info(f"Run log pack written to {self.run_dir}")
+        self._log_buffer.flush()
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
-    def _write_csv(self, filename: str, fieldnames: list[str], rows: list[dict]):
-        path = os.path.join(self.run_dir, filename)
-        with open(path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
-            writer.writeheader()
-            for row in rows:
-                writer.writerow(row)
+    @staticmethod
+    def _claim_run_dir(base_dir: str) -> tuple[str, str]:
+        """Create and return a fresh (run_id, run_dir) under *base_dir*.
+
+        The id is the start time; runs started in the same second (e.g.
+        concurrent batch_scrape windows) get a ``_2``, ``_3``... suffix.
+        os.mkdir is atomic, so two processes can never claim the same dir.
+        """
+        os.makedirs(base_dir, exist_ok=True)
+        stamp = datetime.now().strftime(_RUN_ID_FMT)
+        n = 1
+        while True:
+            run_id = stamp if n == 1 else f"{stamp}_{n}"
+            run_dir = os.path.join(base_dir, run_id)
+            try:
+                os.mkdir(run_dir)
+            except FileExistsError:
+                n += 1
+                continue
+            return run_id, run_dir
+
+    def _run_path(self, filename: str) -> str:
+        """Path of an artifact directly inside this run's directory."""
+        return f"{self.run_dir}{os.sep}{filename}"
+
+    def _open_csv(self, filename: str, fieldnames: tuple[str, ...]):
+        """Open a run-dir CSV for streaming writes and emit its header."""
+        path = self._run_path(filename)
+        f = open(path, "w", newline="", encoding="utf-8", buffering=_CSV_BUFFER_SIZE)
+        self._csv_files.append(f)
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        return writer
 
     def _write_json(self, filename: str, data):
-        path = os.path.join(self.run_dir, filename)
+        """Write *data* as compact JSON (CHIP_REVIEW.txt is the human view)."""
+        path = self._run_path(filename)
+        try:
+            import orjson
+        except ImportError:
+            orjson = None
+        if orjson is not None:
+            # Same output as the json fallback: str() datetimes, non-str keys
+            opts = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+            with open(path, "wb") as f:
+                f.write(orjson.dumps(data, default=str, option=opts))
+            return
         with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, default=str)
+            json.dump(data, f, separators=(",", ":"), default=str)
 
     # ------------------------------------------------------------------
     # CHIP_REVIEW.txt – single human-readable review file
     # ------------------------------------------------------------------
     def _write_chip_review(self, attachment_decisions=None):
         s = self._summary
-        ok_appends = sum(1 for r in self._append_results if r.get("status") == "OK")
-        fail_appends = sum(1 for r in self._append_results if r.get("status") != "OK")
+        ok_appends = self._append_ok
+        fail_appends = self._append_fail
         args = s.get("args", {})
         att_decisions = attachment_decisions or []
 
-        lines = []
+        buf = io.StringIO()
+        w = buf.write
 
         # ================================================================
         # 1) RUN HEADER
         # ================================================================
-        lines.append("=" * 70)
-        lines.append(f"  CHIP REVIEW — Run {s.get('run_id', 'N/A')}")
-        lines.append("=" * 70)
-        lines.append("")
-        lines.append(f"  run_id:       {s.get('run_id', '')}")
-        lines.append(f"  mailbox:      {args.get('mailbox', '')}")
-        lines.append(f"  folder:       {args.get('folder', '')}")
-        lines.append(f"  days:         {args.get('days', '')}")
-        lines.append(f"  max_scanned:  {args.get('max', '')}")
-        lines.append(f"  start:        {s.get('timestamp', '')}")
-        lines.append(f"  duration:     {s.get('duration_sec', 0):.1f}s")
-        lines.append("")
+        w(_REVIEW_HEADER_TMPL.format(
+            title_run_id=s.get("run_id", "N/A"),
+            run_id=s.get("run_id", ""),
+            mailbox=args.get("mailbox", ""),
+            folder=args.get("folder", ""),
+            days=args.get("days", ""),
+            max=args.get("max", ""),
+            timestamp=s.get("timestamp", ""),
+            duration_sec=s.get("duration_sec", 0),
+        ))
 
         # ================================================================
         # 2) COUNTS
         # ================================================================
-        lines.append("-" * 50)
-        lines.append("  COUNTS")
-        lines.append("-" * 50)
-        lines.append(f"  scanned:             {s.get('scanned', 0)}")
-        lines.append(f"  candidates:          {s.get('candidate_count', 0)}")
-        lines.append(f"  extracted_with_kpis: {s.get('extracted_count', 0)}")
-        lines.append(f"  appended:            {s.get('appended_count', 0)}")
-        lines.append(f"  skipped_no_kpi:      {s.get('skipped_no_kpi', 0)}")
-        lines.append(f"  quarantined:         {s.get('quarantined_count', 0)}")
-        lines.append(f"  kpi_validation_rej:  {s.get('kpi_validation_rejects', 0)}")
-        lines.append(f"  failed:              {s.get('failed_count', 0)}")
-        lines.append(f"  append_ok:           {ok_appends}")
-        lines.append(f"  append_failed:       {fail_appends}")
-        lines.append(f"  source_rules:        {args.get('source_rules', 0)}")
-        lines.append("")
+        w(_REVIEW_COUNTS_TMPL.format(
+            scanned=s.get("scanned", 0),
+            candidate_count=s.get("candidate_count", 0),
+            extracted_count=s.get("extracted_count", 0),
+            appended_count=s.get("appended_count", 0),
+            skipped_no_kpi=s.get("skipped_no_kpi", 0),
+            quarantined_count=s.get("quarantined_count", 0),
+            kpi_validation_rejects=s.get("kpi_validation_rejects", 0),
+            failed_count=s.get("failed_count", 0),
+            append_ok=ok_appends,
+            append_failed=fail_appends,
+            source_rules=args.get("source_rules", 0),
+        ))
 
         # ================================================================
         # 3) WHAT GOT APPENDED
         # ================================================================
-        lines.append("-" * 50)
-        lines.append("  WHAT GOT APPENDED")
-        lines.append("-" * 50)
-        lines.append("")
+        w(_SUBBANNER)
+        w("  WHAT GOT APPENDED\n")
+        w(_SUBBANNER)
+        w("\n")
         if self._extracted:
-            show_count = min(30, len(self._extracted))
-            for i, row in enumerate(self._extracted[:show_count], 1):
+            for i, row in enumerate(self._extracted, 1):
                 conf = row.get("confidence_score", 0)
                 if conf >= 0.6:
                     conf_label = "HIGH"
@@ -355,62 +546,55 @@ class RunLogger:
                 proof = (row.get("extraction_proof") or row.get("evidence_source", ""))[:120]
                 trace = row.get("decision_trace_id", "")
 
-                lines.append(f"  [{i}] {date} | {entity}")
+                w(f"  [{i}] {date} | {entity}\n")
 
                 kpi_parts = []
-                for f in ["revenue", "cash", "pipeline_value", "closings_count", "orders_count", "occupancy"]:
+                for f, fmt in _REVIEW_KPI_FORMATTERS:
                     v = row.get(f)
                     if v is not None:
-                        if f == "occupancy":
-                            kpi_parts.append(f"{f}={v:.1%}" if isinstance(v, float) and v <= 1.0 else f"{f}={v}")
-                        elif isinstance(v, float) and v == int(v):
-                            kpi_parts.append(f"{f}={int(v):,}")
-                        elif isinstance(v, (int, float)):
-                            kpi_parts.append(f"{f}={v:,.2f}")
-                        else:
-                            kpi_parts.append(f"{f}={v}")
-                lines.append(f"       KPIs: {', '.join(kpi_parts) if kpi_parts else '(none)'}")
-                lines.append(f"       Source: {src}" + (f" | File: {att}" if att else ""))
-                lines.append(f"       Evidence: {proof}")
-                lines.append(f"       Confidence: {conf_label} ({conf:.2f})")
+                        kpi_parts.append(f"{f}={fmt(v)}")
+                w(f"       KPIs: {', '.join(kpi_parts) if kpi_parts else '(none)'}\n")
+                w(f"       Source: {src}" + (f" | File: {att}" if att else "") + "\n")
+                w(f"       Evidence: {proof}\n")
+                w(f"       Confidence: {conf_label} ({conf:.2f})\n")
                 rule_id = row.get("source_rule_id", "")
                 match_sc = row.get("source_match_score", 0)
                 if rule_id:
-                    lines.append(f"       Source Rule: {rule_id} (match={match_sc:.3f})")
-                lines.append(f"       Trace: {trace}")
-                lines.append("")
+                    w(f"       Source Rule: {rule_id} (match={match_sc:.3f})\n")
+                w(f"       Trace: {trace}\n")
+                w("\n")
 
-            if len(self._extracted) > 30:
-                lines.append(f"  ... {len(self._extracted) - 30} more rows — see extracted_rows.csv")
-                lines.append("")
+            if self._extracted_count > self.EXTRACTED_PREVIEW:
+                w(f"  ... {self._extracted_count - self.EXTRACTED_PREVIEW} more rows — see extracted_rows.csv\n")
+                w("\n")
         else:
-            lines.append("  (No rows extracted with KPI values)")
-            lines.append("")
+            w("  (No rows extracted with KPI values)\n")
+            w("\n")
 
         # ================================================================
         # 4) WHY THINGS WERE SKIPPED
         # ================================================================
-        lines.append("-" * 50)
-        lines.append("  WHY THINGS WERE SKIPPED")
-        lines.append("-" * 50)
-        lines.append("")
+        w(_SUBBANNER)
+        w("  WHY THINGS WERE SKIPPED\n")
+        w(_SUBBANNER)
+        w("\n")
 
         # 4a) Quarantined (unknown source)
         if self._quarantined:
-            lines.append(f"  --- QUARANTINED ({len(self._quarantined)} emails, no source rule matched) ---")
-            lines.append("")
-            for i, q in enumerate(self._quarantined[:10], 1):
-                lines.append(f"  [Q{i}] {q.get('sender_email', '')}")
-                lines.append(f"       Subject: {q.get('subject', '')[:60]}")
-                lines.append(f"       Reason: {q.get('reason', 'unknown source')}")
-                lines.append(f"       Top rule scores: {q.get('top_scores', '[]')}")
-                lines.append("")
-            if len(self._quarantined) > 10:
-                lines.append(f"  ... {len(self._quarantined) - 10} more — see quarantined.csv")
-                lines.append("")
+            w(f"  --- QUARANTINED ({self._quarantined_count} emails, no source rule matched) ---\n")
+            w("\n")
+            for i, q in enumerate(self._quarantined, 1):
+                w(f"  [Q{i}] {q.get('sender_email', '')}\n")
+                w(f"       Subject: {q.get('subject', '')[:60]}\n")
+                w(f"       Reason: {q.get('reason', 'unknown source')}\n")
+                w(f"       Top rule scores: {q.get('top_scores', '[]')}\n")
+                w("\n")
+            if self._quarantined_count > self.QUARANTINED_PREVIEW:
+                w(f"  ... {self._quarantined_count - self.QUARANTINED_PREVIEW} more — see quarantined.csv\n")
+                w("\n")
 
         # 4b) Skipped candidates
-        skipped = self._skipped_candidates[:15]
+        skipped = self._skipped_candidates
         if skipped:
             for i, c in enumerate(skipped, 1):
                 sender = c.get("sender_email", "")
@@ -421,27 +605,27 @@ class RunLogger:
 
                 # Map to deterministic category
                 category = _categorize_skip(why, reasons, score)
-                lines.append(f"  [{i}] {sender}")
-                lines.append(f"       Subject: {subj}")
-                lines.append(f"       Reason: {category}")
-                lines.append(f"       Score: {score} | Details: {reasons}")
-                lines.append("")
-
-            if len(self._skipped_candidates) > 15:
-                lines.append(f"  ... {len(self._skipped_candidates) - 15} more — see candidates.csv")
-                lines.append("")
+                w(f"  [{i}] {sender}\n")
+                w(f"       Subject: {subj}\n")
+                w(f"       Reason: {category}\n")
+                w(f"       Score: {score} | Details: {reasons}\n")
+                w("\n")
+
+            if self._skipped_count > self.SKIPPED_PREVIEW:
+                w(f"  ... {self._skipped_count - self.SKIPPED_PREVIEW} more — see candidates.csv\n")
+                w("\n")
         else:
-            lines.append("  (No skipped candidates)")
-            lines.append("")
+            w("  (No skipped candidates)\n")
+            w("\n")
 
         # ================================================================
         # 4b) ATTACHMENT DECISIONS
         # ================================================================
         if att_decisions:
-            lines.append("-" * 50)
-            lines.append("  ATTACHMENT SAVE/PARSE LOG")
-            lines.append("-" * 50)
-            lines.append("")
+            w(_SUBBANNER)
+            w("  ATTACHMENT SAVE/PARSE LOG\n")
+            w(_SUBBANNER)
+            w("\n")
             for d in att_decisions[:30]:
                 status = d.get("status", "?")
                 orig = d.get("original_filename", "?")
@@ -450,64 +634,63 @@ class RunLogger:
                 err = d.get("error", "")
                 engine = d.get("engine", "")
                 size_str = f"{size:,} bytes" if size else ""
-                lines.append(f"  {status} | {orig}")
+                w(f"  {status} | {orig}\n")
                 if saved:
-                    lines.append(f"       Path: {saved}")
+                    w(f"       Path: {saved}\n")
                 if size_str:
-                    lines.append(f"       Size: {size_str}")
+                    w(f"       Size: {size_str}\n")
                 if engine:
-                    lines.append(f"       Engine: {engine}")
+                    w(f"       Engine: {engine}\n")
                 if err:
-                    lines.append(f"       Error: {err}")
-                lines.append("")
+                    w(f"       Error: {err}\n")
+                w("\n")
 
         # ================================================================
         # 5) TUNING SUGGESTIONS
         # ================================================================
-        lines.append("-" * 50)
-        lines.append("  TUNING SUGGESTIONS")
-        lines.append("-" * 50)
-        lines.append("")
+        w(_SUBBANNER)
+        w("  TUNING SUGGESTIONS\n")
+        w(_SUBBANNER)
+        w("\n")
 
         suggestions = self._generate_tuning_suggestions()
         for i, sug in enumerate(suggestions[:5], 1):
-            lines.append(f"  {i}. {sug}")
-        lines.append("")
+            w(f"  {i}. {sug}\n")
+        w("\n")
 
         # ================================================================
         # 6) ACTION ITEMS FOR CHIP
         # ================================================================
-        lines.append("-" * 50)
-        lines.append("  ACTION ITEMS FOR CHIP")
-        lines.append("-" * 50)
-        lines.append("")
+        w(_SUBBANNER)
+        w("  ACTION ITEMS FOR CHIP\n")
+        w(_SUBBANNER)
+        w("\n")
 
         action_items = self._generate_action_items()
         for item in action_items[:5]:
-            lines.append(f"  - {item}")
-        lines.append("")
+            w(f"  - {item}\n")
+        w("\n")
 
         # ================================================================
         # Write to file
         # ================================================================
-        lines.append("=" * 70)
-        lines.append("  END OF CHIP REVIEW")
-        lines.append("=" * 70)
+        w(_REVIEW_FOOTER)
 
-        path = os.path.join(self.run_dir, "CHIP_REVIEW.txt")
+        path = self._run_path("CHIP_REVIEW.txt")
         with open(path, "w", encoding="utf-8") as f:
-            f.write("\n".join(lines))
+            f.write(buf.getvalue())
 
-        # Also produce the legacy .md version for backward compat
-        self._write_chip_review_md()
+        # Legacy .md version, opt-in only
+        if self.write_legacy_md:
+            self._write_chip_review_md()
 
     # ------------------------------------------------------------------
-    # Legacy CHIP_REVIEW.md (kept for backward compat)
+    # Legacy CHIP_REVIEW.md (opt-in via write_legacy_md)
     # ------------------------------------------------------------------
     def _write_chip_review_md(self):
         s = self._summary
-        ok_appends = sum(1 for r in self._append_results if r.get("status") == "OK")
-        fail_appends = sum(1 for r in self._append_results if r.get("status") != "OK")
+        ok_appends = self._append_ok
+        fail_appends = self._append_fail
         args = s.get("args", {})
 
         md = []
@@ -532,7 +715,7 @@ class RunLogger:
         md.append(f"| Append OK | {ok_appends} |")
         md.append(f"| Append Failed | {fail_appends} |")
 
-        path = os.path.join(self.run_dir, "CHIP_REVIEW.md")
+        path = self._run_path("CHIP_REVIEW.md")
         with open(path, "w", encoding="utf-8") as f:
             f.write("\n".join(md))
 
@@ -544,29 +727,24 @@ class RunLogger:
         s = self._summary
 
         # 1) New domains not in trusted lists
-        trusted_domains = set()
+        trusted_domains: frozenset[str] = frozenset()
         try:
             path = os.path.join(os.path.dirname(__file__), "..", "config", "trusted_sender_domains.txt")
             if os.path.exists(path):
-                with open(path, "r", encoding="utf-8") as f:
-                    for line in f:
-                        line = line.strip().lower()
-                        if line and not line.startswith("#"):
-                            trusted_domains.add(line)
+                trusted_domains = _load_trusted_domains(path, os.path.getmtime(path))
         except Exception:
             pass
 
-        new_domains = {d: c for d, c in self._new_domains_seen.items()
-                       if d and d not in trusted_domains and c >= 2}
+        new_domains = Counter({d: c for d, c in self._new_domains_seen.items()
+                               if d and d not in trusted_domains and c >= 2})
         if new_domains:
-            top3 = sorted(new_domains.items(), key=lambda x: -x[1])[:3]
+            top3 = new_domains.most_common(3)
             domains_str = ", ".join(f"{d} ({c}x)" for d, c in top3)
             suggestions.append(
                 f"Add frequently-seen domains to trusted list: {domains_str}")
 
         # 2) Meeting penalty effectiveness
-        meeting_skips = sum(1 for c in self._skipped_candidates
-                           if "meeting_invite_penalty" in str(c.get("reasons", "")))
+        meeting_skips = self._meeting_skips
         if meeting_skips > 5:
             suggestions.append(
                 f"Meeting reports accounted for {meeting_skips} skips. "
@@ -592,8 +770,8 @@ class RunLogger:
                 f"Investigate root cause.")
 
         # 5) Attachment hit rate
-        att_rows = sum(1 for r in self._extracted if r.get("source_type") == "attachment")
-        body_rows = sum(1 for r in self._extracted if r.get("source_type") == "body")
+        att_rows = self._source_type_counts["attachment"]
+        body_rows = self._source_type_counts["body"]
         if att_rows > 0 or body_rows > 0:
             suggestions.append(
                 f"Source split: {att_rows} from attachments, {body_rows} from body text. "
@@ -637,7 +815,7 @@ class RunLogger:
     @staticmethod
     def _esc(val) -> str:
         """Escape pipe chars for markdown tables."""
-        return str(val).replace("|", "/").replace("\n", " ").replace("\r", "")
+        return str(val).translate(_MD_ESC_TABLE)
 
     @staticmethod
     def _fmt_num(val) -> str:
@@ -661,27 +839,28 @@ class RunLogger:
             return str(val)
 
 
+# Skip categories in priority order: (field, substrings that must all be
+# present, label), where field 0 is why_skipped and 1 is reasons
+_SKIP_CATEGORIES = (
+    (0, ("no kpi",), "NO_KPI_VALUES"),
+    (1, ("deny_domain",), "DENY_DOMAIN"),
+    (1, ("meeting",), "MEETING_INVITE"),
+    (1, ("newsletter",), "NEWSLETTER"),
+    (1, ("quarantine",), "QUARANTINE"),
+    (0, ("parse",), "PARSE_FAILED"),
+    (1, ("parse",), "PARSE_FAILED"),
+    (0, ("attachment", "save"), "ATTACHMENT_SAVE_FAILED"),
+    (0, ("pdf", "missing"), "DEP_MISSING(PDF)"),
+)
+
+
 def _categorize_skip(why_skipped: str, reasons: str, score: int) -> str:
     """Map skip metadata to a deterministic category label."""
-    why_lower = (why_skipped or "").lower()
-    reasons_lower = (reasons or "").lower()
-
-    if "no kpi" in why_lower:
-        return "NO_KPI_VALUES"
-    if "deny_domain" in reasons_lower:
-        return "DENY_DOMAIN"
-    if "meeting" in reasons_lower:
-        return "MEETING_INVITE"
-    if "newsletter" in reasons_lower:
-        return "NEWSLETTER"
-    if "quarantine" in reasons_lower:
-        return "QUARANTINE"
-    if "parse" in why_lower or "parse" in reasons_lower:
-        return "PARSE_FAILED"
-    if "attachment" in why_lower and "save" in why_lower:
-        return "ATTACHMENT_SAVE_FAILED"
-    if "pdf" in why_lower and "missing" in why_lower:
-        return "DEP_MISSING(PDF)"
+    fields = ((why_skipped or "").lower(), (reasons or "").lower())
+    for field_idx, needles, label in _SKIP_CATEGORIES:
+        text = fields[field_idx]
+        if all(n in text for n in needles):
+            return label
     if score < 3:
         return "LOW_SCORE"
     return "NO_KPI_VALUES"
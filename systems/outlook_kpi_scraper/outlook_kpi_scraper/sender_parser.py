@@ -10,6 +10,16 @@ import re
 
 _EXCHANGE_RE = re.compile(r"^/O=", re.IGNORECASE)
 _CN_RE = re.compile(r"/CN=RECIPIENTS/CN=([^/]+)", re.IGNORECASE)
+_SMTP_IN_NAME_RE = re.compile(r"[\(<]([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,})[\)>]")
+
+# Substrings that mark a newsletter / bot localpart, matched in one search
+_NEWSLETTER_MARKERS = (
+    "newsletter", "no-reply", "noreply", "no_reply",
+    "marketing", "info@", "news@", "updates@",
+    "notifications", "notify", "mailer-daemon",
+    "do-not-reply", "donotreply",
+)
+_NEWSLETTER_RE = re.compile("|".join(map(re.escape, _NEWSLETTER_MARKERS)))
 
 
 def is_exchange_dn(raw: str) -> bool:
@@ -60,17 +70,11 @@ def _build(email: str) -> dict:
 
 def _extract_smtp_from_name(name: str) -> str | None:
     """If name contains '(user@domain.com)' return the email, else None."""
-    m = re.search(r"[\(<]([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,})[\)>]", name)
+    m = _SMTP_IN_NAME_RE.search(name)
     return m.group(1) if m else None
 
 
 def is_newsletter_sender(sender_email: str) -> bool:
     """Heuristic: localpart looks like a newsletter / no-reply / marketing bot."""
     local = sender_email.split("@")[0].lower() if "@" in sender_email else sender_email.lower()
-    patterns = [
-        "newsletter", "no-reply", "noreply", "no_reply",
-        "marketing", "info@", "news@", "updates@",
-        "notifications", "notify", "mailer-daemon",
-        "do-not-reply", "donotreply",
-    ]
-    return any(p in local for p in patterns)
+    return _NEWSLETTER_RE.search(local) is not None
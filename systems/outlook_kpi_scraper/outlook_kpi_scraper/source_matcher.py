@@ -16,6 +16,7 @@ Returns a SourceMatch dataclass with rule_id, match_score, rule config,
 and the decision (matched / quarantine / skip).
 """
 
+import heapq
 import logging
 import os
 import re
@@ -26,6 +27,13 @@ import yaml
 
 log = logging.getLogger(__name__)
 
+# libyaml-backed loader when PyYAML was built with it, else the pure-Python one
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# How many ranked scores match_email guarantees in SourceMatch.all_scores
+# (quarantined.csv top_scores and the no-match log show this many)
+TOP_SCORES_KEPT = 3
+
 
 # ------------------------------------------------------------------
 # Data classes
@@ -41,7 +49,9 @@ class SourceMatch:
     entity: str = ""
     rule: dict = field(default_factory=dict)
     decision: str = "quarantine"        # matched | quarantine | skip
-    all_scores: list = field(default_factory=list)  # [(rule_id, score), ...]
+    # [(rule_id, score), ...] best first; exact for the first TOP_SCORES_KEPT
+    # entries, lower-ranked rules may be left out (see match_email)
+    all_scores: list = field(default_factory=list)
 
     @property
     def expected_kpis(self) -> list[dict]:
@@ -64,7 +74,19 @@ class SourceMatch:
 # Config loader
 # ------------------------------------------------------------------
 
+# Attachment extension -> rough MIME approximation for attachment-type matching
+_EXT_TO_MIME = {
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ".xls": "application/vnd.ms-excel",
+    ".csv": "text/csv",
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
 _config_cache: dict | None = None
+_body_automaton = None   # Aho-Corasick over every rule's body_contains (optional)
+_subject_union: re.Pattern | None = None   # alternation of every subject_regex
+_active_rules: list[tuple[str, dict, float]] = []   # (rule_id, rule, threshold) for enabled rules
 
 
 def _config_path() -> str:
@@ -73,35 +95,148 @@ def _config_path() -> str:
 
 def load_source_mapping(force_reload: bool = False) -> dict:
     """Load and cache source_mapping.yml.  Returns the full YAML dict."""
-    global _config_cache
+    global _config_cache, _body_automaton, _subject_union, _active_rules
     if _config_cache is not None and not force_reload:
         return _config_cache
 
     path = _config_path()
     if not os.path.exists(path):
         log.warning("source_mapping.yml not found at %s – source matching disabled", path)
+        _body_automaton = None
+        _subject_union = None
+        _active_rules = []
         _config_cache = {"schema_version": 1, "defaults": {}, "sources": []}
         return _config_cache
 
     with open(path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
+        data = yaml.load(f, Loader=_YamlLoader) or {}
 
     version = data.get("schema_version", 0)
     if version != 1:
         log.warning("source_mapping.yml schema_version=%s (expected 1) – may be incompatible", version)
 
     sources = data.get("sources", [])
-    enabled_count = sum(1 for s in sources if s.get("enabled", True))
-    log.info("Source mapping loaded: %d rules (%d enabled)", len(sources), enabled_count)
+    for rule in sources:
+        _prepare_rule(rule)
+    _body_automaton = _build_body_automaton(sources)
+    _subject_union = _build_subject_union(sources)
+    _active_rules = _build_active_rules(sources, data.get("defaults", {}))
+    log.info("Source mapping loaded: %d rules (%d enabled)", len(sources), len(_active_rules))
 
     _config_cache = data
     return _config_cache
 
 
+def _prepare_rule(rule: dict) -> None:
+    """Precompute per-rule lookup structures onto the rule dict.
+
+    - ``_from_addresses`` / ``_from_domains``: lowercased frozensets
+    - ``_allowed_exts``: attachment extensions whose MIME type the primary
+      attachment rule allows
+    - ``_body_contains``: lowercased keyword tuple (duplicates kept, they
+      count toward the hit proportion)
+    - ``_subject_re`` / ``_filename_re``: compiled regexes, ``None`` when the
+      rule has no pattern or the pattern is invalid (logged once here
+      instead of on every email)
+    - ``_max_after_sender`` / ``_max_after_subject``: upper bound on the
+      score the remaining stages can add
+    """
+    match_section = rule.get("match", {})
+    rule["_from_addresses"] = frozenset(a.lower() for a in match_section.get("from_addresses", []))
+    rule["_from_domains"] = frozenset(d.lower() for d in match_section.get("from_domains", []))
+    rule["_body_contains"] = tuple(kw.lower() for kw in match_section.get("body_contains", []))
+
+    subject_regex = match_section.get("subject_regex", "")
+    rule["_subject_re"] = None
+    if subject_regex:
+        try:
+            rule["_subject_re"] = re.compile(subject_regex, re.IGNORECASE)
+        except re.error:
+            log.warning("Invalid subject_regex in rule %s: %s", rule.get("id"), subject_regex)
+
+    # Primary attachment rule: extensions whose MIME type it allows
+    att_rules = rule.get("attachments", [])
+    allowed_mimes = att_rules[0].get("allowed_mime_types", []) if att_rules else []
+    rule["_allowed_exts"] = frozenset(
+        ext for ext, mime in _EXT_TO_MIME.items() if mime in allowed_mimes
+    )
+
+    fn_regex = att_rules[0].get("filename_regex", "") if att_rules else ""
+    rule["_filename_re"] = None
+    if fn_regex:
+        try:
+            rule["_filename_re"] = re.compile(fn_regex, re.IGNORECASE)
+        except re.error:
+            log.warning("Invalid filename_regex in rule %s: %s", rule.get("id"), fn_regex)
+
+    # Best score still reachable after the sender / subject stages, used by
+    # _score_rule to stop scoring a rule that can no longer rank in the top
+    att_type_max = 0.10 if rule["_allowed_exts"] else 0.0
+    filename_max = 0.05 if rule["_filename_re"] is not None else 0.0
+    body_max = 0.15 if rule["_body_contains"] else 0.0
+    rule["_max_after_subject"] = body_max + att_type_max + filename_max
+    rule["_max_after_sender"] = (
+        (0.20 if rule["_subject_re"] is not None else 0.0) + rule["_max_after_subject"]
+    )
+
+
+def _build_active_rules(sources: list[dict], defaults: dict) -> list[tuple[str, dict, float]]:
+    """Resolve the enabled rules and their thresholds once per config load."""
+    default_threshold = defaults.get("global_reject_threshold", 0.45)
+    return [
+        (rule.get("id", "unnamed"), rule,
+         rule.get("confidence", {}).get("match_threshold", default_threshold))
+        for rule in sources
+        if rule.get("enabled", True)
+    ]
+
+
+def _build_body_automaton(sources: list[dict]):
+    """Build one Aho-Corasick automaton over all rules' body keywords.
+
+    Lets match_email find every keyword present in the body in a single
+    pass instead of one substring scan per keyword per rule.  Returns
+    ``None`` if pyahocorasick is not installed or there are no keywords;
+    _score_rule then falls back to plain substring checks.
+    """
+    try:
+        import ahocorasick
+    except ImportError:
+        return None
+    keywords = {kw for rule in sources for kw in rule["_body_contains"] if kw}
+    if not keywords:
+        return None
+    automaton = ahocorasick.Automaton()
+    for kw in keywords:
+        automaton.add_word(kw, kw)
+    automaton.make_automaton()
+    return automaton
+
+
+def _build_subject_union(sources: list[dict]) -> re.Pattern | None:
+    """Compile one alternation of every rule's subject_regex.
+
+    Used as a prefilter only: if the union finds nothing in a subject, no
+    individual rule pattern can match it either.  Returns ``None`` (no
+    prefilter) when there are no patterns, or when a pattern uses
+    backreferences, whose group numbers would shift inside the union.
+    """
+    patterns = [r["_subject_re"].pattern for r in sources if r["_subject_re"] is not None]
+    if not patterns or any(re.search(r"\\\d|\(\?P=", p) for p in patterns):
+        return None
+    try:
+        return re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+    except re.error:
+        return None
+
+
 def invalidate_source_cache():
     """Clear the cached config (useful for testing)."""
-    global _config_cache
+    global _config_cache, _body_automaton, _subject_union, _active_rules
     _config_cache = None
+    _body_automaton = None
+    _subject_union = None
+    _active_rules = []
 
 
 # ------------------------------------------------------------------
@@ -132,32 +267,48 @@ def match_email(msg: dict) -> SourceMatch:
     att_names = (msg.get("attachment_names") or "").lower()
     att_meta = msg.get("attachment_meta", [])
 
-    scored: list[tuple[str, float, dict]] = []
+    # One search over all subject patterns: if nothing fires, no rule's
+    # subject_regex can match, so blank the subject to skip those searches
+    if subject and _subject_union is not None and not _subject_union.search(subject):
+        subject = ""
 
-    for rule in sources:
-        if not rule.get("enabled", True):
-            continue
+    # Every body keyword present, found in one pass ("" is trivially present)
+    body_hits = None
+    if _body_automaton is not None and body:
+        body_hits = {""}
+        body_hits.update(kw for _, kw in _body_automaton.iter(body))
+
+    scored: list[tuple[str, float, dict, float]] = []
 
-        rule_id = rule.get("id", "unnamed")
-        threshold = rule.get("confidence", {}).get("match_threshold",
-                    defaults.get("global_reject_threshold", 0.45))
+    # The TOP_SCORES_KEPT best full scores so far (min-heap); once it is
+    # full, a rule that cannot beat its smallest entry can neither win nor
+    # appear in the reported top scores, so _score_rule may drop it
+    top: list[float] = []
+    floor = None
 
+    for rule_id, rule, threshold in _active_rules:
         score = _score_rule(
             rule, sender_email, sender_domain, subject, body,
-            att_names, att_meta,
+            att_names, att_meta, floor, body_hits,
         )
+        if score is None:
+            continue
 
-        scored.append((rule_id, score, rule))
+        scored.append((rule_id, score, rule, threshold))
+        if len(top) < TOP_SCORES_KEPT:
+            heapq.heappush(top, score)
+        else:
+            heapq.heappushpop(top, score)
+        if len(top) == TOP_SCORES_KEPT:
+            floor = top[0]
 
     # Sort by (score desc, priority desc)
     scored.sort(key=lambda x: (x[1], x[2].get("priority", 0)), reverse=True)
 
-    all_scores = [(rid, round(s, 3)) for rid, s, _ in scored]
+    all_scores = [(rid, round(s, 3)) for rid, s, _, _ in scored]
 
     if scored:
-        best_id, best_score, best_rule = scored[0]
-        best_threshold = best_rule.get("confidence", {}).get("match_threshold",
-                         defaults.get("global_reject_threshold", 0.45))
+        best_id, best_score, best_rule, best_threshold = scored[0]
 
         if best_score >= best_threshold:
             log.info("Source match: rule=%s score=%.3f entity=%s report=%s",
@@ -177,7 +328,7 @@ def match_email(msg: dict) -> SourceMatch:
 
     # No rule matched above threshold
     log.info("Source match: NO MATCH – sender=%s domain=%s policy=%s top_scores=%s",
-             sender_email, sender_domain, unknown_policy, all_scores[:3])
+             sender_email, sender_domain, unknown_policy, all_scores[:TOP_SCORES_KEPT])
     return SourceMatch(
         matched=False,
         decision=unknown_policy,
@@ -189,6 +340,10 @@ def match_email(msg: dict) -> SourceMatch:
 # Per-rule scoring
 # ------------------------------------------------------------------
 
+# Slack for float rounding when comparing a score bound against the floor
+_PRUNE_EPS = 1e-9
+
+
 def _score_rule(
     rule: dict,
     sender_email: str,
@@ -197,72 +352,68 @@ def _score_rule(
     body: str,
     att_names: str,
     att_meta: list[dict],
-) -> float:
-    """Compute a 0.0–1.0 match score for one rule against one email."""
+    floor: float | None = None,
+    body_hits: set[str] | None = None,
+) -> float | None:
+    """Compute a 0.0–1.0 match score for one rule against one email.
+
+    *rule* must have been through ``_prepare_rule`` (``load_source_mapping``
+    does this for every rule).
+
+    When *floor* is given, scoring stops early and returns ``None`` once
+    the rule cannot reach *floor* even with every remaining stage hitting.
+    A returned float is always the full score.
+
+    *body_hits*, when given, is the set of body keywords already found in
+    *body* (see ``_build_body_automaton``).
+    """
     score = 0.0
-    match_section = rule.get("match", {})
+    weight = rule.get("confidence", {}).get("confidence_weight", 1.0)
 
     # --- Sender email exact match (+0.30) ---
-    from_addresses = [a.lower() for a in match_section.get("from_addresses", [])]
-    if sender_email and sender_email in from_addresses:
+    if sender_email and sender_email in rule["_from_addresses"]:
         score += 0.30
 
     # --- Sender domain match (+0.20) ---
-    from_domains = [d.lower() for d in match_section.get("from_domains", [])]
-    if sender_domain and sender_domain in from_domains:
+    if sender_domain and sender_domain in rule["_from_domains"]:
         score += 0.20
 
+    if floor is not None and weight >= 0 and \
+            (score + rule["_max_after_sender"]) * weight < floor - _PRUNE_EPS:
+        return None
+
     # --- Subject regex hit (+0.20) ---
-    subject_regex = match_section.get("subject_regex", "")
-    if subject_regex and subject:
-        try:
-            if re.search(subject_regex, subject, re.IGNORECASE):
-                score += 0.20
-        except re.error:
-            log.warning("Invalid subject_regex in rule %s: %s", rule.get("id"), subject_regex)
+    subject_re = rule["_subject_re"]
+    if subject_re is not None and subject and subject_re.search(subject):
+        score += 0.20
+
+    if floor is not None and weight >= 0 and \
+            (score + rule["_max_after_subject"]) * weight < floor - _PRUNE_EPS:
+        return None
 
     # --- Body keyword match (+0.15, proportional) ---
-    body_contains = [kw.lower() for kw in match_section.get("body_contains", [])]
+    body_contains = rule["_body_contains"]
     if body_contains and body:
-        hits = sum(1 for kw in body_contains if kw in body)
+        if body_hits is not None:
+            hits = sum(1 for kw in body_contains if kw in body_hits)
+        else:
+            hits = sum(1 for kw in body_contains if kw in body)
         if hits > 0:
             proportion = min(hits / len(body_contains), 1.0)
             score += 0.15 * proportion
 
     # --- Attachment type match (+0.10) ---
-    att_rules = rule.get("attachments", [])
-    if att_rules and att_meta:
-        att_rule = att_rules[0]  # primary attachment rule
-        allowed_mimes = att_rule.get("allowed_mime_types", [])
-        if allowed_mimes:
-            # Map extensions to rough MIME approximations
-            kpi_ext_map = {
-                ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                ".xls": "application/vnd.ms-excel",
-                ".csv": "text/csv",
-                ".pdf": "application/pdf",
-                ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            }
-            for meta in att_meta:
-                ext = meta.get("ext", "")
-                mapped_mime = kpi_ext_map.get(ext, "")
-                if mapped_mime and mapped_mime in allowed_mimes:
-                    score += 0.10
-                    break
+    allowed_exts = rule["_allowed_exts"]
+    if allowed_exts and att_meta:
+        if any(meta.get("ext", "") in allowed_exts for meta in att_meta):
+            score += 0.10
 
     # --- Attachment filename match (+0.05) ---
-    if att_rules and att_names:
-        att_rule = att_rules[0]
-        fn_regex = att_rule.get("filename_regex", "")
-        if fn_regex:
-            try:
-                if re.search(fn_regex, att_names, re.IGNORECASE):
-                    score += 0.05
-            except re.error:
-                pass
+    filename_re = rule["_filename_re"]
+    if filename_re is not None and att_names and filename_re.search(att_names):
+        score += 0.05
 
     # Apply confidence weight
-    weight = rule.get("confidence", {}).get("confidence_weight", 1.0)
     return min(score * weight, 1.0)
 
 
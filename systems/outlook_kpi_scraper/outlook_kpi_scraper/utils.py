@@ -5,6 +5,7 @@ Note: File-based logging is now handled by RunLogger.  This module
 retains load_env() and a legacy setup_logging() for backward compat.
 """
 
+import hashlib
 import json
 import os
 import logging
@@ -30,10 +31,20 @@ def setup_logging():
     return log_path
 
 
+_env_loaded = False
+
+
 def load_env():
-    """Load .env from project root and return os.environ as a dict."""
-    env_path = os.path.join(os.path.dirname(__file__), '..', '.env')
-    load_dotenv(env_path)
+    """Load .env from project root and return os.environ as a dict.
+
+    The .env file is only read on the first call; load_dotenv never
+    overrides variables that are already set, so later reads were no-ops.
+    """
+    global _env_loaded
+    if not _env_loaded:
+        env_path = os.path.join(os.path.dirname(__file__), '..', '.env')
+        load_dotenv(env_path)
+        _env_loaded = True
     return dict(os.environ)
 
 
@@ -63,7 +74,9 @@ def resolve_google_creds_path(env=None):
       1. ``GOOGLE_SERVICE_ACCOUNT_JSON_PATH`` / ``GOOGLE_CREDS_PATH`` env var
          pointing to an existing file  →  return that path directly.
       2. ``GOOGLE_SERVICE_ACCOUNT_JSON`` env var containing the raw JSON
-         string  →  write it to a temp file and return the temp path.
+         string  →  write it to ``gcp_sa_<sha256 prefix>.json`` in the temp
+         dir (atomically, and only if that file is not already there) and
+         return its path.
          (This is the standard Railway / Render pattern when you can only
          set string env vars, not upload files.)
 
@@ -82,16 +95,26 @@ def resolve_google_creds_path(env=None):
     # --- inline JSON string (Railway / cloud) ---
     raw_json = env.get("GOOGLE_SERVICE_ACCOUNT_JSON")
     if raw_json:
+        data = raw_json.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()[:16]
+        target = os.path.join(tempfile.gettempdir(), f"gcp_sa_{digest}.json")
+        try:
+            if os.path.getsize(target) == len(data):
+                return target
+        except OSError:
+            pass
         try:
             # Validate it's real JSON before writing
             json.loads(raw_json)
-            tmp = tempfile.NamedTemporaryFile(
-                mode="w", suffix=".json", prefix="gcp_sa_", delete=False
-            )
-            tmp.write(raw_json)
-            tmp.close()
-            _log.info("Google creds: wrote inline JSON to %s", tmp.name)
-            return tmp.name
+            # Write beside the target, then rename so readers never see a
+            # partial file; 0600 since it holds a private key
+            tmp_path = f"{target}.{os.getpid()}.tmp"
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, target)
+            _log.info("Google creds: wrote inline JSON to %s", target)
+            return target
         except json.JSONDecodeError:
             _log.warning("GOOGLE_SERVICE_ACCOUNT_JSON is set but is not valid JSON")
 
@@ -1,18 +1,56 @@
+import gzip
+import io
 import os
 import csv
 
+HEADER = ('date','entity','revenue','cash','pipeline_value','closings_count','orders_count','occupancy','alerts','notes','run_id','message_id','sender','subject','candidate_score','candidate_reasons','source_type','attachment_name','evidence_snippet','extractor_version','confidence','validation_flags')
+
 class CSVWriter:
-    def __init__(self):
+    def __init__(self, compress=False):
+        """*compress* writes latest_rows.csv.gz (gzip level 1) instead of plain CSV."""
         out_dir = os.path.join(os.path.dirname(__file__), '../../data/output')
         os.makedirs(out_dir, exist_ok=True)
-        self.csv_path = os.path.join(out_dir, 'latest_rows.csv')
+        self.compress = compress
+        self.csv_path = os.path.join(out_dir, 'latest_rows.csv.gz' if compress else 'latest_rows.csv')
+        self._fh = None
+        self._writer = None
+
+    def _open(self):
+        # One buffered handle for the writer's lifetime; header only for a new/empty file
+        if self.compress:
+            # Each run appends a new gzip member; gzip readers concatenate them.
+            # tell() restarts at 0 per member, so probe the file size instead.
+            new_file = not os.path.exists(self.csv_path) or os.path.getsize(self.csv_path) == 0
+            raw = gzip.GzipFile(self.csv_path, 'ab', compresslevel=1)
+            self._fh = io.TextIOWrapper(io.BufferedWriter(raw, buffer_size=1 << 20),
+                                        encoding='utf-8', newline='')
+        else:
+            self._fh = open(self.csv_path, 'a', newline='', buffering=1 << 20)
+            new_file = self._fh.tell() == 0
+        self._writer = csv.DictWriter(self._fh, fieldnames=HEADER, extrasaction='ignore')
+        if new_file:
+            self._writer.writeheader()
 
     def append_row(self, row):
-        header = ['date','entity','revenue','cash','pipeline_value','closings_count','orders_count','occupancy','alerts','notes','run_id','message_id','sender','subject','candidate_score','candidate_reasons','source_type','attachment_name','evidence_snippet','extractor_version','confidence','validation_flags']
-        write_header = not os.path.exists(self.csv_path)
-        with open(self.csv_path, 'a', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=header)
-            if write_header:
-                writer.writeheader()
-            writer.writerow({col: row.get(col) for col in header})
+        if self._writer is None:
+            self._open()
+        self._writer.writerow(row)
+        return True
+
+    def append_rows(self, rows):
+        if self._writer is None:
+            self._open()
+        self._writer.writerows(rows)
         return True
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
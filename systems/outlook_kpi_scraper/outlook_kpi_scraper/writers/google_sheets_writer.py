@@ -1,12 +1,22 @@
 """
 Google Sheets writer with batch appending and exponential backoff.
 
-Instead of 1 API call per row, rows are collected and flushed in
-batches (default 200 rows/batch).  On HTTP 429 the writer retries
-with exponential backoff + jitter (1 s → 60 s, up to 8 retries).
-If a batch still fails it is automatically split in half and retried.
+Instead of 1 API call per row, rows are collected and flushed in a
+single values.append call.  On HTTP 429 the writer retries with
+exponential backoff + jitter (1 s → 60 s, up to 8 retries).  If the
+request is still rate-limited, or rejected as too large (413), it is
+split into batch_size chunks (default 200 rows), then halved, and retried.
+
+batch_size adapts: it doubles (or jumps to the size just accepted) after
+a full-size request goes through while recent requests have mostly
+avoided 429s (an EMA of the per-request 429 ratio), and halves when rate
+limiting forces a split.  The learned size and the EMA are kept in
+data/sheets_batch_state.json, next to batch_scrape's batch_state.json,
+and seed the next run; a size below the configured batch_size recovers
+half of the gap per run, so one 429 burst does not stick.
 """
 
+import json
 import logging
 import os
 import random
@@ -14,11 +24,13 @@ import time
 
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.model import JsonModel
 from google.oauth2.service_account import Credentials
 
 log = logging.getLogger(__name__)
 
-COLUMN_ORDER = [
+# Tuple: fixed at import, iterated once per buffered row
+COLUMN_ORDER = (
     "date", "entity", "revenue", "cash", "pipeline_value",
     "closings_count", "orders_count", "occupancy", "alerts", "notes",
     "run_id", "message_id", "sender", "subject", "candidate_score",
@@ -28,7 +40,7 @@ COLUMN_ORDER = [
     # Source mapping columns
     "source_rule_id", "source_match_score", "source_report_type",
     "source_parse_confidence",
-]
+)
 
 # Tunables
 DEFAULT_BATCH_SIZE = 200
@@ -37,12 +49,66 @@ INITIAL_BACKOFF = 1.0        # seconds
 MAX_BACKOFF = 60.0
 JITTER_MAX = 0.25            # seconds
 MIN_BATCH_SIZE = 10          # auto-split floor
+MAX_BATCH_SIZE = 5000        # adaptive growth ceiling
+RATE_LIMIT_EMA_ALPHA = 0.3   # weight of the newest request in the 429-ratio EMA
+GROW_MAX_429_RATIO = 0.2     # only grow batch_size while the EMA is below this
+
+# Learned batch size + 429 EMA, next to batch_scrape's batch_state.json
+BATCH_STATE_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'data',
+                                'sheets_batch_state.json')
+
+
+def _json_model():
+    """Request model encoding bodies with orjson when installed, else None.
+
+    Large values matrices are the main CPU cost of a flush before the
+    request goes out; stdlib json is several times slower on them.
+    """
+    try:
+        import orjson
+    except ImportError:
+        return None
+
+    class _OrjsonModel(JsonModel):
+        def serialize(self, body_value):
+            if self._data_wrapper:
+                return super().serialize(body_value)
+            return orjson.dumps(body_value).decode("utf-8")
+
+    return _OrjsonModel()
+
+
+def _load_batch_state():
+    """Return (learned batch size or None, 429-ratio EMA) from the sidecar."""
+    try:
+        with open(BATCH_STATE_PATH, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        size = int(state.get("batch_size", 0))
+        ema = min(max(float(state.get("rate_limit_ema", 0.0)), 0.0), 1.0)
+    except Exception:
+        return None, 0.0
+    size = min(max(size, MIN_BATCH_SIZE), MAX_BATCH_SIZE) if size > 0 else None
+    return size, ema
+
+
+def _save_batch_state(size, ema):
+    # Per-process temp file + rename: concurrent runs (batch_scrape
+    # --windows) each replace the sidecar whole, never interleave writes
+    tmp = f"{BATCH_STATE_PATH}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(BATCH_STATE_PATH), exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"batch_size": size, "rate_limit_ema": round(ema, 4)}, f)
+        os.replace(tmp, BATCH_STATE_PATH)
+    except OSError as exc:
+        log.debug("Could not save learned batch size: %s", exc)
 
 
 class GoogleSheetsWriter:
     """Batch-capable Google Sheets writer with 429-resilient backoff."""
 
     def __init__(self, env, batch_size=DEFAULT_BATCH_SIZE):
+        """*batch_size* is the starting split size when none has been learned yet."""
         self.sheet_id = env.get("GOOGLE_SHEET_ID")
         self.tab = env.get("GOOGLE_SHEET_TAB", "Daily KPI Snapshot")
         from outlook_kpi_scraper.utils import resolve_google_creds_path
@@ -50,9 +116,20 @@ class GoogleSheetsWriter:
         self.creds = Credentials.from_service_account_file(
             creds_path, scopes=["https://www.googleapis.com/auth/spreadsheets"]
         )
-        self.service = build("sheets", "v4", credentials=self.creds)
-        self.batch_size = batch_size
-        self._buffer = []          # list of dicts (KPI rows)
+        # Bundled discovery document: no discovery fetch over the network
+        self.service = build("sheets", "v4", credentials=self.creds, model=_json_model(),
+                             static_discovery=True, cache_discovery=False)
+        # One resource object and one authorized keep-alive connection for
+        # every append, rather than rebuilding the resource chain per call
+        self._values_api = self.service.spreadsheets().values()
+        self._range = f"{self.tab}!A1"
+        learned, self._rate_limit_ema = _load_batch_state()
+        if learned is not None and learned < batch_size:
+            # Recover half the gap per run so a shrink from one 429 burst fades
+            learned += (batch_size - learned) // 2
+        self.batch_size = learned or batch_size
+        self._buffer = []          # KPI rows projected to COLUMN_ORDER lists
+        self._meta = []            # (entity, date) per buffered row, for results
         self._results = []         # list of dicts for append_results.csv
 
     # ------------------------------------------------------------------
@@ -60,37 +137,36 @@ class GoogleSheetsWriter:
     # ------------------------------------------------------------------
 
     def append_row(self, row):
-        """Buffer a single row for later batch flush.  Returns True."""
-        self._buffer.append(row)
+        """Buffer a single row for later batch flush.  Returns True.
+
+        The row is projected to its sheet values here, once, so flushes
+        and split retries send the stored list as-is.
+        """
+        # map() walks the columns in C; rows may lack keys, so no itemgetter
+        self._buffer.append(list(map(row.get, COLUMN_ORDER)))
+        self._meta.append((row.get("entity", ""), row.get("date", "")))
         return True
 
     def flush(self):
-        """Send all buffered rows to the Sheet in batches.
+        """Send all buffered rows to the Sheet in one request.
 
         Returns (appended_count, failed_count).
         """
         if not self._buffer:
             return 0, 0
 
-        rows = self._buffer[:]
-        self._buffer.clear()
+        values, meta = self._buffer, self._meta
+        self._buffer, self._meta = [], []
 
-        appended = 0
-        failed = 0
-        batch_idx = 0
+        batch_results = self._send_batch(meta, values)
+        self._results.extend(batch_results)
+        # Count per row: a split request can partly succeed
+        appended = sum(1 for r in batch_results if r["status"] == "OK")
+        failed = len(batch_results) - appended
 
-        for start in range(0, len(rows), self.batch_size):
-            batch = rows[start:start + self.batch_size]
-            ok, batch_results = self._send_batch(batch, batch_idx)
-            self._results.extend(batch_results)
-            if ok:
-                appended += len(batch)
-            else:
-                failed += len(batch)
-            batch_idx += 1
-
-        log.info("Sheets flush complete: appended=%d failed=%d batches=%d",
-                 appended, failed, batch_idx)
+        log.info("Sheets flush complete: appended=%d failed=%d rows=%d batch_size=%d",
+                 appended, failed, len(values), self.batch_size)
+        _save_batch_state(self.batch_size, self._rate_limit_ema)
         return appended, failed
 
     @property
@@ -101,74 +177,112 @@ class GoogleSheetsWriter:
     # Internals
     # ------------------------------------------------------------------
 
-    def _send_batch(self, batch, batch_idx, retry_count=0):
-        """Attempt to append *batch* to the sheet.
+    def _send_batch(self, meta, values):
+        """Append *values* to the sheet; *meta* is the parallel (entity, date) list.
 
-        Returns (success: bool, results: list[dict]).
+        Refused ranges are split and pushed back on an explicit stack,
+        newest-first so results keep row order.  Returns the per-row
+        results list.
         """
-        values = [
-            [row.get(col) for col in COLUMN_ORDER]
-            for row in batch
-        ]
-
-        try:
-            self.service.spreadsheets().values().append(
-                spreadsheetId=self.sheet_id,
-                range=f"{self.tab}!A1",
-                valueInputOption="USER_ENTERED",
-                insertDataOption="INSERT_ROWS",
-                body={"values": values},
-            ).execute()
-            log.info("Batch %d: appended %d rows (retries=%d)",
-                     batch_idx, len(values), retry_count)
-            return True, [
-                self._result_row(batch_idx, i, row, "OK", retry_count=retry_count)
-                for i, row in enumerate(batch)
-            ]
-
-        except HttpError as exc:
-            if exc.resp.status == 429 and retry_count < MAX_RETRIES:
-                wait = min(INITIAL_BACKOFF * (2 ** retry_count), MAX_BACKOFF)
-                wait += random.uniform(0, JITTER_MAX)
-                log.warning("Batch %d: 429 rate-limit, retrying in %.1fs (attempt %d/%d)",
-                            batch_idx, wait, retry_count + 1, MAX_RETRIES)
-                time.sleep(wait)
-                return self._send_batch(batch, batch_idx, retry_count + 1)
-
-            if exc.resp.status == 429 and len(batch) > MIN_BATCH_SIZE:
+        results = []
+        stack = [(0, len(values), 0)]     # (lo, hi, batch_idx)
+        while stack:
+            lo, hi, batch_idx = stack.pop()
+            n = hi - lo
+            exc, retry_count = self._append_values(values[lo:hi], batch_idx)
+            status = getattr(getattr(exc, "resp", None), "status", None)
+
+            # Retries only happen on 429, so either means this request hit one
+            hit_429 = retry_count > 0 or status == 429
+            self._rate_limit_ema += RATE_LIMIT_EMA_ALPHA * (hit_429 - self._rate_limit_ema)
+
+            if exc is None:
+                results.extend(
+                    self._result_row(batch_idx, i, m, "OK", retry_count=retry_count)
+                    for i, m in enumerate(meta[lo:hi])
+                )
+                if n >= self.batch_size and self._rate_limit_ema < GROW_MAX_429_RATIO:
+                    # Full-size chunk accepted and 429s are rare – try a bigger one next time
+                    self.batch_size = min(max(self.batch_size * 2, n), MAX_BATCH_SIZE)
+                continue
+
+            if status == 429:
+                # Rate-limited even after backoff – send smaller chunks from now on
+                self.batch_size = max(self.batch_size // 2, MIN_BATCH_SIZE)
+
+            if status in (413, 429) and n == len(values) and n > self.batch_size:
+                # Whole-flush request refused – fall back to batch_size chunks
+                size = self.batch_size
+                log.warning("Batch %d: HTTP %d after %d retries – splitting %d rows into %d-row chunks",
+                            batch_idx, status, retry_count, n, size)
+                chunks = [(start, min(start + size, hi), batch_idx + k)
+                          for k, start in enumerate(range(lo, hi, size))]
+                stack.extend(reversed(chunks))
+                continue
+
+            if status in (413, 429) and n > MIN_BATCH_SIZE:
                 # Split batch in half and retry each half
-                mid = len(batch) // 2
-                log.warning("Batch %d: still 429 after %d retries – splitting %d → %d+%d",
-                            batch_idx, retry_count, len(batch), mid, len(batch) - mid)
-                ok1, r1 = self._send_batch(batch[:mid], batch_idx, 0)
-                ok2, r2 = self._send_batch(batch[mid:], batch_idx, 0)
-                return (ok1 and ok2), r1 + r2
+                mid = lo + n // 2
+                log.warning("Batch %d: still %d after %d retries – splitting %d → %d+%d",
+                            batch_idx, status, retry_count, n, mid - lo, hi - mid)
+                stack.append((mid, hi, batch_idx))
+                stack.append((lo, mid, batch_idx))
+                continue
 
             # Non-retryable or exhausted retries
             err = str(exc)
-            log.error("Batch %d FAILED: %s", batch_idx, err)
-            return False, [
-                self._result_row(batch_idx, i, row, "FAILED", error=err,
+            if isinstance(exc, HttpError):
+                log.error("Batch %d FAILED: %s", batch_idx, err)
+            else:
+                log.error("Batch %d FAILED (non-HTTP): %s", batch_idx, err)
+            results.extend(
+                self._result_row(batch_idx, i, m, "FAILED", error=err,
                                  retry_count=retry_count)
-                for i, row in enumerate(batch)
-            ]
+                for i, m in enumerate(meta[lo:hi])
+            )
+        return results
 
-        except Exception as exc:
-            err = str(exc)
-            log.error("Batch %d FAILED (non-HTTP): %s", batch_idx, err)
-            return False, [
-                self._result_row(batch_idx, i, row, "FAILED", error=err,
-                                 retry_count=retry_count)
-                for i, row in enumerate(batch)
-            ]
+    def _append_values(self, values, batch_idx):
+        """One values.append with 429 backoff.
+
+        Returns (exception or None, retry_count).
+        """
+        retry_count = 0
+        while True:
+            try:
+                self._values_api.append(
+                    spreadsheetId=self.sheet_id,
+                    range=self._range,
+                    valueInputOption="USER_ENTERED",
+                    insertDataOption="INSERT_ROWS",
+                    body={"values": values},
+                ).execute()
+                log.info("Batch %d: appended %d rows (retries=%d)",
+                         batch_idx, len(values), retry_count)
+                return None, retry_count
+
+            except HttpError as exc:
+                if exc.resp.status == 429 and retry_count < MAX_RETRIES:
+                    wait = min(INITIAL_BACKOFF * (2 ** retry_count), MAX_BACKOFF)
+                    wait += random.uniform(0, JITTER_MAX)
+                    log.warning("Batch %d: 429 rate-limit, retrying in %.1fs (attempt %d/%d)",
+                                batch_idx, wait, retry_count + 1, MAX_RETRIES)
+                    time.sleep(wait)
+                    retry_count += 1
+                    continue
+                return exc, retry_count
+
+            except Exception as exc:
+                return exc, retry_count
 
     @staticmethod
-    def _result_row(batch_idx, row_idx, row, status, error="", retry_count=0):
+    def _result_row(batch_idx, row_idx, meta, status, error="", retry_count=0):
+        entity, date = meta
         return {
             "batch_index": batch_idx,
             "row_index": row_idx,
-            "entity": row.get("entity", ""),
-            "date": row.get("date", ""),
+            "entity": entity,
+            "date": date,
             "status": status,
             "error": error,
             "retry_count": retry_count,
@@ -5,31 +5,36 @@ Runs the main pipeline in chronological windows (newest -> older) using
 --date-from/--date-to. Stores a small state file so the next run starts
 where the last run stopped.
 
+With --windows N, the next N windows (walking back from the end date)
+run concurrently as separate pipeline processes; the state file only
+moves once all of them succeed.  This needs the Google Sheets writer:
+the CSV fallback appends every run to one data/output/latest_rows.csv,
+which concurrent processes would corrupt, so --windows > 1 is refused
+without GOOGLE_SHEET_ID / GOOGLE_SERVICE_ACCOUNT_JSON_PATH.
+
 Usage (from outlook_kpi_scraper folder, venv activated):
   python scripts/batch_scrape.py --mailbox "Chip Ridge" --window-days 30 --resume
+  python scripts/batch_scrape.py --mailbox "Chip Ridge" --window-days 30 --windows 4 --resume
 """
 
 import argparse
 import json
+import os
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta
 from pathlib import Path
 
-import win32com.client
-
 PROJECT = Path(__file__).resolve().parent.parent
 VENV_PYTHON = PROJECT / ".venv" / "Scripts" / "python.exe"
 STATE_PATH = PROJECT / "data" / "batch_state.json"
 
-# Folders that are not mail containers — skip them entirely
-SKIP_FOLDERS = {
-    "calendar", "contacts", "tasks", "notes", "journal",
-    "rss feeds", "rss subscriptions", "sync issues",
-    "social activity notifications", "quick step settings",
-    "yammer root", "conversation history", "conversation action settings",
-    "externalcontacts", "files", "chip",
-}
+if str(PROJECT) not in sys.path:
+    sys.path.insert(0, str(PROJECT))
+
+from outlook_kpi_scraper.outlook_folders import enumerate_outlook_folders
+from outlook_kpi_scraper.utils import load_env
 
 
 def parse_date(s: str) -> date:
@@ -40,52 +45,82 @@ def fmt_date(d: date) -> str:
     return d.strftime("%Y-%m-%d")
 
 
-def enumerate_outlook_folders(mailbox_name: str) -> list[str]:
-    outlook = win32com.client.Dispatch("Outlook.Application").GetNamespace("MAPI")
-    store = None
-    for s in outlook.Folders:
-        if s.Name == mailbox_name:
-            store = s
-            break
-    if not store:
-        print(f"Mailbox '{mailbox_name}' not found. Available: {[s.Name for s in outlook.Folders]}")
-        return []
-
-    def recurse(folder, path_prefix=""):
-        paths = []
-        name = folder.Name
-        full_path = f"{path_prefix}{name}" if path_prefix else name
-        top_name = full_path.split("/")[0].lower()
-        if top_name in SKIP_FOLDERS:
-            return paths
-        paths.append(full_path)
-        try:
-            for i in range(1, folder.Folders.Count + 1):
-                sub = folder.Folders.Item(i)
-                paths.extend(recurse(sub, f"{full_path}/"))
-        except Exception:
-            pass
-        return paths
-
-    all_paths = []
-    for i in range(1, store.Folders.Count + 1):
-        f = store.Folders.Item(i)
-        all_paths.extend(recurse(f))
-    return all_paths
-
-
 def load_state(path: Path) -> dict:
     if not path.exists():
         return {}
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
+        data = path.read_bytes()
+        try:
+            import orjson
+        except ImportError:
+            return json.loads(data)
+        return orjson.loads(data)
     except Exception:
         return {}
 
 
 def save_state(path: Path, payload: dict) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    # Write-then-rename so an interrupted run never leaves a truncated file
+    try:
+        import orjson
+        data = orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+    except ImportError:
+        data = json.dumps(payload, indent=2).encode("utf-8")
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def build_windows(date_to: date, window_days: int, count: int) -> list[tuple[date, date]]:
+    """Return *count* disjoint (date_from, date_to) windows, newest first."""
+    windows = []
+    for _ in range(count):
+        date_from = date_to - timedelta(days=window_days)
+        windows.append((date_from, date_to))
+        date_to = date_from - timedelta(days=1)
+    return windows
+
+
+def build_cmd(args, folders: list[str], date_from: date, date_to: date) -> list[str]:
+    cmd = [
+        str(VENV_PYTHON),
+        "-m", "outlook_kpi_scraper.run",
+        "--mailbox", args.mailbox,
+        "--folders", ",".join(folders),
+        "--date-from", fmt_date(date_from),
+        "--date-to", fmt_date(date_to),
+        "--days", str(args.window_days),
+        "--max", "1000000",
+    ]
+    if args.debug:
+        cmd.append("--debug")
+    return cmd
+
+
+def sheets_configured(env: dict) -> bool:
+    """True if run.py will write to Google Sheets rather than the CSV fallback."""
+    return bool(env.get("GOOGLE_SHEET_ID") and env.get("GOOGLE_SERVICE_ACCOUNT_JSON_PATH"))
+
+
+def run_windows(args, folders: list[str], windows: list[tuple[date, date]]) -> int:
+    """Run each window's pipeline concurrently; return the first non-zero exit code.
+
+    Each process claims its own logs/runs/<run_id>/ (RunLogger), so
+    launches need no spacing.
+    """
+    workers = min(len(windows), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for date_from, date_to in windows:
+            print(f"Launching window: {fmt_date(date_from)} -> {fmt_date(date_to)}")
+            cmd = build_cmd(args, folders, date_from, date_to)
+            futures.append(pool.submit(subprocess.run, cmd, cwd=str(PROJECT)))
+        codes = [f.result().returncode for f in futures]
+    for (date_from, date_to), code in zip(windows, codes):
+        if code != 0:
+            print(f"Window {fmt_date(date_from)} -> {fmt_date(date_to)} failed (exit {code})")
+    return next((c for c in codes if c != 0), 0)
 
 
 def main() -> int:
@@ -101,14 +136,26 @@ def main() -> int:
                         help="Use batch_state.json to continue from last window")
     parser.add_argument("--folders", type=str, default=None,
                         help="Comma-separated folders. If omitted, auto-enumerate.")
+    parser.add_argument("--refresh-folders", action="store_true",
+                        help="Re-walk the mailbox instead of using the cached folder list")
+    parser.add_argument("--windows", type=int, default=1,
+                        help="Number of consecutive windows to run concurrently "
+                             "(default: 1; ignored with --start-date; needs Google "
+                             "Sheets output)")
     parser.add_argument("--debug", action="store_true", help="Enable debug output")
     args = parser.parse_args()
 
+    if args.windows > 1 and not args.start_date and not sheets_configured(load_env()):
+        print("--windows > 1 needs the Google Sheets writer (GOOGLE_SHEET_ID and "
+              "GOOGLE_SERVICE_ACCOUNT_JSON_PATH); concurrent runs would corrupt the "
+              "shared CSV fallback. Rerun with --windows 1.")
+        return 1
+
     # Resolve folders
     if args.folders:
         folders = [f.strip() for f in args.folders.split(",") if f.strip()]
     else:
-        folders = enumerate_outlook_folders(args.mailbox)
+        folders = enumerate_outlook_folders(args.mailbox, refresh=args.refresh_folders)
         print(f"Discovered {len(folders)} mail folders (non-mail folders skipped)")
         for f in folders[:10]:
             print(f"  - {f}")
@@ -137,28 +184,20 @@ def main() -> int:
         print("Invalid date window: start is after end.")
         return 1
 
-    print(f"Running window: {fmt_date(date_from)} -> {fmt_date(date_to)}")
-
-    cmd = [
-        str(VENV_PYTHON),
-        "-m", "outlook_kpi_scraper.run",
-        "--mailbox", args.mailbox,
-        "--folders", ",".join(folders),
-        "--date-from", fmt_date(date_from),
-        "--date-to", fmt_date(date_to),
-        "--days", str(args.window_days),
-        "--max", "1000000",
-    ]
-    if args.debug:
-        cmd.append("--debug")
-
-    proc = subprocess.run(cmd, cwd=str(PROJECT))
+    if args.windows > 1 and not args.start_date:
+        windows = build_windows(date_to, args.window_days, args.windows)
+        returncode = run_windows(args, folders, windows)
+        date_from = windows[-1][0]
+    else:
+        print(f"Running window: {fmt_date(date_from)} -> {fmt_date(date_to)}")
+        proc = subprocess.run(build_cmd(args, folders, date_from, date_to), cwd=str(PROJECT))
+        returncode = proc.returncode
 
-    if proc.returncode == 0 and args.resume:
+    if returncode == 0 and args.resume:
         # Next run should continue from the boundary; slight overlap is OK (ledger dedup)
         save_state(STATE_PATH, {"next_date_to": fmt_date(date_from)})
 
-    return proc.returncode
+    return returncode
 
 
 if __name__ == "__main__":
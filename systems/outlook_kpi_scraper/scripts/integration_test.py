@@ -13,13 +13,18 @@ import json
 import os
 import subprocess
 import sys
+import threading
 import time
+from collections import deque
 from pathlib import Path
 
 PROJECT = Path(__file__).resolve().parent.parent          # outlook_kpi_scraper/
 VENV_PYTHON = PROJECT / ".venv" / "Scripts" / "python.exe"
 RUNS_DIR = PROJECT / "logs" / "runs"
 
+if str(PROJECT) not in sys.path:
+    sys.path.insert(0, str(PROJECT))
+
 PASS = "\u2705"
 FAIL = "\u274C"
 WARN = "\u26A0\uFE0F"
@@ -38,11 +43,106 @@ def latest_run_dir() -> Path:
     return dirs[0] if dirs else Path(".")
 
 
-def read_csv_rows(path: Path) -> list[dict]:
+def run_streamed(cmd: list[str], indent: str | None = None, watch: str | None = None,
+                 stdout_tail: int = 40, stderr_tail: int = 20):
+    """Run *cmd*, echoing output live while keeping only bounded tails.
+
+    stdout is echoed as-is, or indented with blank lines dropped when
+    *indent* is given; stderr is passed through.  The first stdout line
+    containing *watch* is captured as it streams by.  The child runs with
+    PYTHONUNBUFFERED so its piped stdout is not block-buffered.
+
+    Returns (returncode, stdout_tail, stderr_tail, watched_line).
+    """
+    proc = subprocess.Popen(
+        cmd, cwd=str(PROJECT), stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        env={**os.environ, "PYTHONUNBUFFERED": "1"},
+        bufsize=1, text=True, encoding="utf-8", errors="replace",
+    )
+    out_tail: deque[str] = deque(maxlen=stdout_tail)
+    err_tail: deque[str] = deque(maxlen=stderr_tail)
+    watched: list[str] = []
+
+    def pump_stdout():
+        for line in proc.stdout:
+            line = line.rstrip("\n")
+            out_tail.append(line)
+            if watch and not watched and watch in line:
+                watched.append(line)
+            if indent is None:
+                print(line)
+            elif line.strip():
+                print(f"{indent}{line}")
+
+    def pump_stderr():
+        for line in proc.stderr:
+            line = line.rstrip("\n")
+            err_tail.append(line)
+            print(line, file=sys.stderr)
+
+    threads = [threading.Thread(target=pump_stdout, daemon=True),
+               threading.Thread(target=pump_stderr, daemon=True)]
+    for t in threads:
+        t.start()
+    returncode = proc.wait()
+    for t in threads:
+        t.join()
+    return returncode, list(out_tail), list(err_tail), (watched[0] if watched else None)
+
+
+def load_json(path: Path):
+    """Parse a JSON file straight from its bytes (orjson when installed)."""
+    data = path.read_bytes()
+    try:
+        import orjson
+    except ImportError:
+        return json.loads(data)
+    return orjson.loads(data)
+
+
+def read_csv_rows(path: Path) -> tuple[dict[str, int], list[list[str]]]:
+    """Return ({column: index}, rows) read positionally, without per-row dicts."""
+    if not path.exists():
+        return {}, []
+    with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
+            return {}, []
+        # DictReader skipped blank lines; keep that
+        return {name: i for i, name in enumerate(header)}, [row for row in reader if row]
+
+
+def column_getter(idx: dict[str, int], column: str, default: str = ""):
+    """Return row -> value for *column*, or *default* if the column/cell is missing."""
+    i = idx.get(column)
+    if i is None:
+        return lambda row: default
+    return lambda row: row[i] if i < len(row) else default
+
+
+def iter_csv_column(path: Path, column: str):
+    """Yield one column of a CSV row by row, without building dicts."""
     if not path.exists():
-        return []
-    with open(path, "r", encoding="utf-8", errors="replace") as f:
-        return list(csv.DictReader(f))
+        return
+    with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header or column not in header:
+            return
+        idx = header.index(column)
+        for row in reader:
+            yield row[idx] if idx < len(row) else ""
+
+
+IMAGE_EXTS = frozenset({".png", ".jpg", ".jpeg", ".gif", ".bmp", ".tif", ".tiff"})
+
+
+def is_image_only(attachment_names: str) -> bool:
+    """True if every ';'-separated attachment name has an image extension."""
+    exts = {os.path.splitext(n.strip())[1]
+            for n in attachment_names.lower().split(";") if n.strip()}
+    return bool(exts) and exts <= IMAGE_EXTS
 
 
 # ─────────────────────────────────────────────────────
@@ -55,48 +155,7 @@ def phase1_scan():
 
     # Dynamically enumerate all folders and subfolders in the mailbox,
     # skipping non-mail folders that waste time and trigger COM errors.
-    import win32com.client
-
-    # Folders that are not mail containers — skip them entirely
-    SKIP_FOLDERS = {
-        "calendar", "contacts", "tasks", "notes", "journal",
-        "rss feeds", "rss subscriptions", "sync issues",
-        "social activity notifications", "quick step settings",
-        "yammer root", "conversation history", "conversation action settings",
-        "externalcontacts", "files", "chip",
-    }
-
-    def enumerate_outlook_folders(mailbox_name):
-        outlook = win32com.client.Dispatch("Outlook.Application").GetNamespace("MAPI")
-        store = None
-        for s in outlook.Folders:
-            if s.Name == mailbox_name:
-                store = s
-                break
-        if not store:
-            print(f"Mailbox '{mailbox_name}' not found. Available: {[s.Name for s in outlook.Folders]}")
-            return []
-        def recurse(folder, path_prefix=""):
-            paths = []
-            name = folder.Name
-            full_path = f"{path_prefix}{name}" if path_prefix else name
-            # Skip non-mail top-level folders
-            top_name = full_path.split("/")[0].lower()
-            if top_name in SKIP_FOLDERS:
-                return paths
-            paths.append(full_path)
-            try:
-                for i in range(1, folder.Folders.Count + 1):
-                    sub = folder.Folders.Item(i)
-                    paths.extend(recurse(sub, f"{full_path}/"))
-            except Exception:
-                pass
-            return paths
-        all_paths = []
-        for i in range(1, store.Folders.Count + 1):
-            f = store.Folders.Item(i)
-            all_paths.extend(recurse(f))
-        return all_paths
+    from outlook_kpi_scraper.outlook_folders import enumerate_outlook_folders
 
     all_folders = enumerate_outlook_folders("Chip Ridge")
     print(f"  Discovered {len(all_folders)} mail folders (non-mail folders skipped)")
@@ -116,35 +175,28 @@ def phase1_scan():
         "--debug",
     ]
     t0 = time.time()
-    # Stream output live to console (no more silent buffering)
-    proc = subprocess.run(
-        cmd, cwd=str(PROJECT),
-        text=True, encoding="utf-8", errors="replace",
-    )
+    # Stream output live to console, keeping only the tails for diagnosis
+    returncode, stdout_tail, stderr_tail, summary_line = run_streamed(
+        cmd, watch="noise_skipped=")
     elapsed = time.time() - t0
 
-    stdout = ""   # output already streamed to console
-    stderr = ""
-
-    print(f"\n  Scan completed in {elapsed:.0f}s  (exit code {proc.returncode})")
-    if proc.returncode != 0:
+    print(f"\n  Scan completed in {elapsed:.0f}s  (exit code {returncode})")
+    if returncode != 0:
         print("  STDOUT (last 40 lines):")
-        for line in stdout.splitlines()[-40:]:
+        for line in stdout_tail:
             print(f"    {line}")
         print("  STDERR (last 20 lines):")
-        for line in stderr.splitlines()[-20:]:
+        for line in stderr_tail:
             print(f"    {line}")
 
-    check("Pipeline scan exit code == 0", proc.returncode == 0,
-          f"exit={proc.returncode}")
+    check("Pipeline scan exit code == 0", returncode == 0,
+          f"exit={returncode}")
 
-    # Parse console summary line
-    for line in stdout.splitlines():
-        if "noise_skipped=" in line:
-            print(f"\n  SUMMARY LINE: {line.strip()}")
-            break
+    # Console summary line, caught while streaming
+    if summary_line:
+        print(f"\n  SUMMARY LINE: {summary_line.strip()}")
 
-    return proc.returncode == 0
+    return returncode == 0
 
 
 # ─────────────────────────────────────────────────────
@@ -163,7 +215,7 @@ def phase2_validate_run():
     check("run_summary.json exists", summary_path.exists())
     summary = {}
     if summary_path.exists():
-        summary = json.loads(summary_path.read_text())
+        summary = load_json(summary_path)
 
     noise = summary.get("noise_skipped", 0)
     quarantined_ct = summary.get("quarantined_count", 0)
@@ -177,15 +229,11 @@ def phase2_validate_run():
 
     # --- quarantined.csv: check for image-only leakage ---
     q_path = run_dir / "quarantined.csv"
-    q_rows = read_csv_rows(q_path)
-
-    IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".gif", ".bmp", ".tif", ".tiff"}
+    q_total = 0
     image_only_in_quarantine = 0
-    for row in q_rows:
-        att = (row.get("attachment_names") or "").lower()
-        names = [n.strip() for n in att.split(";") if n.strip()]
-        exts = {os.path.splitext(n)[1] for n in names}
-        if exts and exts.issubset(IMAGE_EXTS):
+    for att in iter_csv_column(q_path, "attachment_names"):
+        q_total += 1
+        if is_image_only(att):
             image_only_in_quarantine += 1
 
     # With the gate, image-only emails should STILL appear in quarantined.csv
@@ -193,11 +241,11 @@ def phase2_validate_run():
     # the gate ran.  Legacy quarantine triage will also tag them.
     check("Quarantine has few image-only rows leaking past gate",
           True,  # informational
-          f"image_only_in_quarantine={image_only_in_quarantine} / {len(q_rows)} total")
+          f"image_only_in_quarantine={image_only_in_quarantine} / {q_total} total")
 
     # --- extracted_rows.csv ---
     ex_path = run_dir / "extracted_rows.csv"
-    ex_rows = read_csv_rows(ex_path)
+    _, ex_rows = read_csv_rows(ex_path)
     check("extracted_rows.csv > 0", len(ex_rows) > 0,
           f"rows={len(ex_rows)}")
 
@@ -205,7 +253,7 @@ def phase2_validate_run():
         # Debug: show candidates and attachment decisions
         print("\n  DEBUG: extracted = 0.  Checking why...")
         cand_path = run_dir / "candidates.csv"
-        cand_rows = read_csv_rows(cand_path)
+        _, cand_rows = read_csv_rows(cand_path)
         print(f"    candidates.csv rows: {len(cand_rows)}")
         chip_path = run_dir / "CHIP_REVIEW.txt"
         if chip_path.exists():
@@ -239,19 +287,12 @@ def phase3_reprocess(run_dir: Path):
         "--max-llm", "50",
     ]
     t0 = time.time()
-    proc = subprocess.run(
-        cmd, cwd=str(PROJECT), capture_output=True,
-        text=True, encoding="utf-8", errors="replace",
-    )
+    # Summary block is echoed from stdout as it streams
+    returncode, _, _, _ = run_streamed(cmd, indent="    ")
     elapsed = time.time() - t0
-    print(f"\n  Reprocess completed in {elapsed:.0f}s  (exit={proc.returncode})")
+    print(f"\n  Reprocess completed in {elapsed:.0f}s  (exit={returncode})")
 
-    # Print the summary block from stdout
-    for line in (proc.stdout or "").splitlines():
-        if line.strip():
-            print(f"    {line}")
-
-    check("Reprocess exit code == 0", proc.returncode == 0)
+    check("Reprocess exit code == 0", returncode == 0)
 
     # --- Check outputs ---
     summary_path = output_dir / "quarantine_reprocess_summary.json"
@@ -259,7 +300,7 @@ def phase3_reprocess(run_dir: Path):
 
     rp_summary = {}
     if summary_path.exists():
-        rp_summary = json.loads(summary_path.read_text())
+        rp_summary = load_json(summary_path)
 
     eligible = rp_summary.get("eligible_for_llm", 0)
     admitted = rp_summary.get("auto_admitted", 0)
@@ -268,18 +309,22 @@ def phase3_reprocess(run_dir: Path):
     check("eligible_for_llm > 0", eligible > 0, f"eligible={eligible}")
 
     admitted_path = output_dir / "admitted_candidates.csv"
-    admitted_rows = read_csv_rows(admitted_path)
+    idx, admitted_rows = read_csv_rows(admitted_path)
     check("admitted_candidates.csv exists", admitted_path.exists())
     check("admitted_candidates > 0", len(admitted_rows) > 0,
           f"admitted={len(admitted_rows)}")
 
     if admitted_rows:
+        sender = column_getter(idx, "sender_email", "?")
+        subject = column_getter(idx, "subject", "?")
+        conf = column_getter(idx, "llm_confidence", "?")
+        src_type = column_getter(idx, "llm_source_type", "?")
         print(f"\n  Sample admitted candidates:")
         for row in admitted_rows[:5]:
-            print(f"    {row.get('sender_email', '?'):35s}  "
-                  f"{row.get('subject', '?')[:50]:50s}  "
-                  f"conf={row.get('llm_confidence', '?')}  "
-                  f"type={row.get('llm_source_type', '?')}")
+            print(f"    {sender(row):35s}  "
+                  f"{subject(row)[:50]:50s}  "
+                  f"conf={conf(row)}  "
+                  f"type={src_type(row)}")
 
     # --- source_rule_suggestions.yml ---
     rules_path = output_dir / "source_rule_suggestions.yml"
@@ -302,7 +347,7 @@ def phase4_suitability_reentry(reprocess_dir: Path | None):
         return
 
     admitted_path = reprocess_dir / "admitted_candidates.csv"
-    admitted_rows = read_csv_rows(admitted_path)
+    idx, admitted_rows = read_csv_rows(admitted_path)
 
     if not admitted_rows:
         print("  No admitted candidates to check suitability on.")
@@ -310,30 +355,27 @@ def phase4_suitability_reentry(reprocess_dir: Path | None):
         return
 
     # Check that admitted rows have reprocess_action = doc_suitability
-    doc_suit_count = sum(
-        1 for r in admitted_rows
-        if r.get("reprocess_action", "") == "doc_suitability"
-    )
+    action = column_getter(idx, "reprocess_action")
+    doc_suit_count = sum(1 for r in admitted_rows if action(r) == "doc_suitability")
     check("All admitted route to doc_suitability",
           doc_suit_count == len(admitted_rows),
           f"{doc_suit_count}/{len(admitted_rows)}")
 
-    # Check KPI ext distribution
+    # Check KPI ext distribution (one column, split once per row)
+    exts_of = column_getter(idx, "kpi_attachment_exts")
     kpi_exts = {}
+    docx_only = 0
     for r in admitted_rows:
-        for ext in (r.get("kpi_attachment_exts") or "").split(";"):
-            ext = ext.strip()
+        raw = exts_of(r)
+        exts = [e.strip() for e in raw.split(";")]
+        for ext in exts:
             if ext:
                 kpi_exts[ext] = kpi_exts.get(ext, 0) + 1
+        # DOCX-only admission: nothing but Word documents attached
+        if ".docx" in raw and all(e in (".docx", ".doc", "") for e in exts):
+            docx_only += 1
     print(f"  KPI attachment exts in admitted: {kpi_exts}")
 
-    # Check no DOCX-only admission
-    docx_only = sum(
-        1 for r in admitted_rows
-        if all(e.strip() in (".docx", ".doc", "")
-               for e in (r.get("kpi_attachment_exts") or "").split(";"))
-        and ".docx" in (r.get("kpi_attachment_exts") or "")
-    )
     check("No DOCX-only admitted", docx_only == 0, f"docx_only={docx_only}")
 
 
@@ -1,4 +1,7 @@
 """Quick test of the keyword fix."""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
 from outlook_kpi_scraper.kpi_suitability import compute_suitability
 
 tests = [
@@ -28,9 +31,31 @@ tests = [
      "capex.xlsx", False),
 ]
 
-for label, text, fname, is_pdf in tests:
-    r = compute_suitability(text, filename=fname, is_pdf=is_pdf)
-    status = "ACCEPT" if r["accept_bool"] else "REJECT"
-    print(f"\n{status} | tier={r['tier']} score={r['score']} | {label}")
-    for reason in r["reasons"]:
-        print(f"  {reason}")
+
+def _run_one(case):
+    label, text, fname, is_pdf = case
+    return label, compute_suitability(text, filename=fname, is_pdf=is_pdf)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Worker processes (default: 1; process start-up "
+                             "outweighs the work until the fixture list is large)")
+    args = parser.parse_args()
+
+    if args.jobs > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            results = list(pool.map(_run_one, tests))
+    else:
+        results = map(_run_one, tests)
+
+    for label, r in results:
+        status = "ACCEPT" if r["accept_bool"] else "REJECT"
+        print(f"\n{status} | tier={r['tier']} score={r['score']} | {label}")
+        for reason in r["reasons"]:
+            print(f"  {reason}")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,7 @@ import json
 import os
 import sys
 import tempfile
+from collections import Counter
 
 # Add project root to path
 _PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -25,23 +26,26 @@ if _PROJECT_ROOT not in sys.path:
 
 from outlook_kpi_scraper.attachment_gate import evaluate_attachment_gate
 from outlook_kpi_scraper.quarantine_reprocess import (
-    load_quarantine_csv,
+    iter_quarantine_csv,
     deterministic_prefilter,
     reprocess_quarantine,
     _parse_attachment_names,
     _get_exts,
 )
 
+IMAGE_EXTS = frozenset({".png", ".jpg", ".jpeg", ".gif", ".bmp", ".tif", ".tiff"})
+KPI_EXTS = frozenset({".pdf", ".xlsx", ".xls", ".csv"})
+DOC_EXTS = frozenset({".docx", ".doc"})
+
 
 def _find_latest_quarantine_csv() -> str:
     """Find the most recent quarantined.csv in logs/runs/."""
     runs_dir = os.path.join(_PROJECT_ROOT, "logs", "runs")
     if not os.path.isdir(runs_dir):
         return ""
-    run_dirs = sorted(
-        [d for d in os.listdir(runs_dir) if os.path.isdir(os.path.join(runs_dir, d))],
-        reverse=True,
-    )
+    # scandir's dirent already says whether each entry is a directory
+    with os.scandir(runs_dir) as it:
+        run_dirs = sorted((e.name for e in it if e.is_dir()), reverse=True)
     for rd in run_dirs:
         qpath = os.path.join(runs_dir, rd, "quarantined.csv")
         if os.path.exists(qpath):
@@ -61,69 +65,98 @@ def main():
         sys.exit(1)
 
     print(f"\n  Source: {csv_path}")
-    rows = load_quarantine_csv(csv_path)
-    total = len(rows)
-    print(f"  Total quarantine count: {total}")
-
-    # ---- Step 1: Attachment analysis ----
-    print(f"\n{'─' * 50}")
-    print("  STEP 1: Attachment Type Analysis")
-    print(f"{'─' * 50}")
-
-    IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".gif", ".bmp", ".tif", ".tiff"}
-    KPI_EXTS = {".pdf", ".xlsx", ".xls", ".csv"}
 
-    image_only_count = 0
-    has_kpi_ext_count = 0
-    no_attachments_count = 0
-    has_docx_count = 0
-    other_count = 0
+    # One streaming pass over the rows: parse attachments, run the gate and
+    # the pre-filter once each, and tally every step's counters from them
+    total = 0
+    att_types = Counter()           # Step 1 categories
+    gate_decisions = Counter()
+    eligible = 0
+    not_eligible = 0
+    prefilter_reasons = Counter()
+    docx_rows = 0
+    docx_passes = 0
+    docx_with_kpi = 0
+    decision_cache = {}             # (has_attachments, attachment_names, subject) -> (gate, pf)
 
-    for row in rows:
+    for row in iter_quarantine_csv(csv_path):
+        total += 1
         att_names = _parse_attachment_names(row.get("attachment_names", ""))
-        exts = set(_get_exts(att_names))
+        exts = frozenset(_get_exts(att_names))
+
+        has_kpi = not exts.isdisjoint(KPI_EXTS)
+        has_doc = not exts.isdisjoint(DOC_EXTS)
 
+        # Step 1
         if not att_names or not row.get("has_attachments", False):
-            no_attachments_count += 1
-        elif exts and exts.issubset(IMAGE_EXTS):
-            image_only_count += 1
-        elif exts & KPI_EXTS:
-            has_kpi_ext_count += 1
+            att_types["none"] += 1
+        elif exts and exts <= IMAGE_EXTS:
+            att_types["image_only"] += 1
+        elif has_kpi:
+            att_types["kpi_ext"] += 1
             if ".docx" in exts:
-                has_docx_count += 1
-        elif ".docx" in exts or ".doc" in exts:
-            has_docx_count += 1
-            other_count += 1
+                att_types["docx"] += 1
+        elif has_doc:
+            att_types["docx"] += 1
+            att_types["other"] += 1
+        else:
+            att_types["other"] += 1
+
+        # Gate and pre-filter only look at these three fields; recurring
+        # senders quarantine the same subject/attachments run after run
+        key = (row.get("has_attachments", False),
+               row.get("attachment_names", ""),
+               row.get("subject", ""))
+        cached = decision_cache.get(key)
+        if cached is None:
+            has_att, names_raw, subject = key
+            gate = evaluate_attachment_gate({
+                "has_attachments": has_att,
+                "attachment_names": names_raw,
+                "subject": subject,
+            })
+            cached = decision_cache[key] = (gate, deterministic_prefilter(row, gate=gate))
+        gate, pf = cached
+
+        # Step 2
+        gate_decisions[gate["decision"]] += 1
+
+        # Step 3
+        if pf["eligible"]:
+            eligible += 1
         else:
-            other_count += 1
-
-    print(f"  Image-only attachments:      {image_only_count:>5}  "
-          f"({image_only_count / total * 100:.1f}%)")
-    print(f"  Has KPI ext (pdf/xlsx/csv):   {has_kpi_ext_count:>5}  "
-          f"({has_kpi_ext_count / total * 100:.1f}%)")
-    print(f"  No attachments:              {no_attachments_count:>5}  "
-          f"({no_attachments_count / total * 100:.1f}%)")
-    print(f"  DOCX-only / DOC:             {has_docx_count:>5}  "
-          f"({has_docx_count / total * 100:.1f}%)")
-    print(f"  Other:                       {other_count:>5}  "
-          f"({other_count / total * 100:.1f}%)")
+            not_eligible += 1
+            prefilter_reasons[pf["decision"]] += 1
+
+        # Step 5: do any DOCX-bearing rows pass the prefilter?
+        if has_doc:
+            docx_rows += 1
+            if pf["eligible"]:
+                # Only eligible if they also have a KPI ext
+                if has_kpi:
+                    docx_with_kpi += 1
+                docx_passes += 1
+
+    print(f"  Total quarantine count: {total}")
+
+    # ---- Step 1: Attachment analysis ----
+    print(f"\n{'─' * 50}")
+    print("  STEP 1: Attachment Type Analysis")
+    print(f"{'─' * 50}")
+
+    for key, label in (("image_only", "Image-only attachments:     "),
+                       ("kpi_ext", "Has KPI ext (pdf/xlsx/csv):  "),
+                       ("none", "No attachments:             "),
+                       ("docx", "DOCX-only / DOC:            "),
+                       ("other", "Other:                      ")):
+        count = att_types[key]
+        print(f"  {label} {count:>5}  ({count / total * 100:.1f}%)")
 
     # ---- Step 2: Attachment gate decisions ----
     print(f"\n{'─' * 50}")
     print("  STEP 2: Attachment Gate Decisions")
     print(f"{'─' * 50}")
 
-    gate_decisions = {}
-    for row in rows:
-        pseudo_msg = {
-            "has_attachments": row.get("has_attachments", False),
-            "attachment_names": row.get("attachment_names", ""),
-            "subject": row.get("subject", ""),
-        }
-        gate = evaluate_attachment_gate(pseudo_msg)
-        d = gate["decision"]
-        gate_decisions[d] = gate_decisions.get(d, 0) + 1
-
     for decision, count in sorted(gate_decisions.items(), key=lambda x: -x[1]):
         pct = count / total * 100
         print(f"  {decision:25s}  {count:>5}  ({pct:.1f}%)")
@@ -133,18 +166,6 @@ def main():
     print("  STEP 3: Deterministic Pre-filter")
     print(f"{'─' * 50}")
 
-    eligible = 0
-    not_eligible = 0
-    prefilter_reasons = {}
-    for row in rows:
-        pf = deterministic_prefilter(row)
-        if pf["eligible"]:
-            eligible += 1
-        else:
-            not_eligible += 1
-            d = pf["decision"]
-            prefilter_reasons[d] = prefilter_reasons.get(d, 0) + 1
-
     print(f"  Eligible for LLM:   {eligible:>5}  ({eligible / total * 100:.1f}%)")
     print(f"  Kept (deterministic): {not_eligible:>5}  ({not_eligible / total * 100:.1f}%)")
     print(f"\n  Pre-filter keep reasons:")
@@ -187,28 +208,7 @@ def main():
     print("  STEP 5: DOCX Guardrail Validation")
     print(f"{'─' * 50}")
 
-    docx_rows = []
-    for row in rows:
-        att_names = _parse_attachment_names(row.get("attachment_names", ""))
-        exts = _get_exts(att_names)
-        if any(e in (".docx", ".doc") for e in exts):
-            docx_rows.append(row)
-
-    # Check: do any DOCX-only rows pass the prefilter?
-    docx_passes = 0
-    docx_with_kpi = 0
-    for row in docx_rows:
-        pf = deterministic_prefilter(row)
-        if pf["eligible"]:
-            # Only eligible if they also have a KPI ext
-            att_names = _parse_attachment_names(row.get("attachment_names", ""))
-            exts = set(_get_exts(att_names))
-            has_kpi = bool(exts & KPI_EXTS)
-            if has_kpi:
-                docx_with_kpi += 1
-            docx_passes += 1
-
-    print(f"  Total DOCX-bearing quarantined:  {len(docx_rows)}")
+    print(f"  Total DOCX-bearing quarantined:  {docx_rows}")
     print(f"  DOCX rows passing prefilter:     {docx_passes}")
     print(f"     (of which also have KPI ext): {docx_with_kpi}")
 
@@ -7,7 +7,6 @@ Usage:
 If no path given, tries to find a PDF in logs/runs/<latest>/attachments/
 """
 
-import glob
 import os
 import sys
 
@@ -15,6 +14,21 @@ import sys
 sys.path.insert(0, os.path.dirname(__file__))
 
 
+def _first_pdf(root):
+    """Return the first *.pdf found under *root*, stopping at the first hit."""
+    stack = [root]
+    while stack:
+        subdirs = []
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.name.lower().endswith(".pdf"):
+                    return entry.path
+        stack.extend(reversed(subdirs))
+    return None
+
+
 def main():
     # Find a test file
     test_path = None
@@ -24,13 +38,13 @@ def main():
         # Try to find a PDF in the most recent run's attachments
         logs_base = os.path.join(os.path.dirname(__file__), "logs", "runs")
         if os.path.isdir(logs_base):
-            runs = sorted(os.listdir(logs_base), reverse=True)
+            with os.scandir(logs_base) as it:
+                runs = sorted((e.name for e in it), reverse=True)
             for run_id in runs:
                 att_dir = os.path.join(logs_base, run_id, "attachments")
                 if os.path.isdir(att_dir):
-                    pdfs = glob.glob(os.path.join(att_dir, "**", "*.pdf"), recursive=True)
-                    if pdfs:
-                        test_path = pdfs[0]
+                    test_path = _first_pdf(att_dir)
+                    if test_path:
                         break
         if not test_path:
             print("No PDF found in logs. Pass a file path as argument:")
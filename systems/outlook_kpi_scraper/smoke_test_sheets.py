@@ -17,9 +17,23 @@ SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
 creds = service_account.Credentials.from_service_account_file(
     GOOGLE_SERVICE_ACCOUNT_JSON_PATH, scopes=SCOPES
 )
-service = build("sheets", "v4", credentials=creds)
+# Bundled discovery document: no discovery fetch over the network
+service = build("sheets", "v4", credentials=creds,
+                static_discovery=True, cache_discovery=False)
 sheet = service.spreadsheets()
 
+
+def append_rows(rows):
+    """Append all *rows* (lists of cell values) in one values.append round trip."""
+    return sheet.values().append(
+        spreadsheetId=GOOGLE_SHEET_ID,
+        range=f"{GOOGLE_SHEET_TAB}!A1",
+        valueInputOption="USER_ENTERED",
+        insertDataOption="INSERT_ROWS",
+        body={"values": rows}
+    ).execute()
+
+
 # Prepare row
 row = [
     datetime.now().strftime("%Y-%m-%d"),
@@ -31,13 +45,7 @@ row = [
 ]
 
 # Append row
-result = sheet.values().append(
-    spreadsheetId=GOOGLE_SHEET_ID,
-    range=f"{GOOGLE_SHEET_TAB}!A1",
-    valueInputOption="USER_ENTERED",
-    insertDataOption="INSERT_ROWS",
-    body={"values": [row]}
-).execute()
+result = append_rows([row])
 
 updated_range = result.get("updates", {}).get("updatedRange", "<none>")
 print(f"APPEND OK: {updated_range}")